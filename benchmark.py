@@ -0,0 +1,113 @@
+"""Ingestion benchmarks against the stand-in FPL API.
+
+For each league size this starts fake_fpl_api on a free port, points
+fetch_fpl_data at it with a scratch database and reports wall time and
+upstream requests for a cold and a repeated gameweek ingest, a full-season
+backfill and the first and steady-state live refresh ticks.
+
+    python benchmark.py --sizes 20,200,2000 --latency 0.02
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import fetch_fpl_data as fpl
+from fake_fpl_api import FakeFPLServer, SyntheticLeague
+
+DEFAULT_SIZES = '20,500,5000,50000'
+
+
+def reset_app(base_url, workdir):
+    """Point the app at a fresh database and upstream, dropping all caches."""
+    fpl.FPL_API_BASE = base_url
+    fpl.DB_PATH = os.path.join(workdir, 'fpl_history.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(fpl.DB_PATH + suffix):
+            os.remove(fpl.DB_PATH + suffix)
+    fpl._db_local = threading.local()
+    fpl._backfilled_leagues.clear()
+    fpl._backfill_failures.clear()
+    fpl._events_cache.update({'events': None, 'elements': None, 'fetched_at': 0})
+    fpl._finalized_gameweeks.clear()
+    fpl._rate_limiter.update({'rate': fpl.RATE_LIMIT, 'tokens': 0.0, 'paused_until': 0.0})
+    fpl._live_picks.update({'gameweek': None, 'picks': {}, 'leagues': {}})
+    fpl._fixtures_cache.clear()
+    with fpl._response_cache_lock:
+        fpl._response_cache.clear()
+    fpl.init_db()
+
+
+def measure(server, action):
+    """Run ``action``; return (seconds, upstream requests)."""
+    server.reset_stats()
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    with server.stats_lock:
+        return elapsed, server.stats.get('total', 0)
+
+
+def run_size(entries, league_ids, gameweek, latency, error_rate):
+    """Benchmark one league size and return its result row."""
+    source = SyntheticLeague(entries, league_ids, gameweek)
+    server = FakeFPLServer(('127.0.0.1', 0), source, latency=latency, error_rate=error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)  # The gameweek JSON cache is written relative to the cwd
+            reset_app(server.base_url, workdir)
+            row = {'entries': entries}
+            row['cold_ingest'] = measure(server, lambda: fpl.ingest_gameweek(gameweek, league_ids))
+            row['warm_ingest'] = measure(server, lambda: fpl.ingest_gameweek(gameweek, league_ids))
+            reset_app(server.base_url, workdir)
+            row['backfill'] = measure(server, lambda: fpl.backfill_season(league_ids))
+
+            source.live = True
+            fpl._events_cache['fetched_at'] = 0
+            row['live_first'] = measure(server, lambda: fpl.ingest_live_gameweek(gameweek, league_ids))
+            fpl._fixtures_cache.clear()  # A real tick refetches fixtures through the scheduler
+            row['live_steady'] = measure(server, lambda: fpl.ingest_live_gameweek(gameweek, league_ids))
+            return row
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        server.server_close()
+
+
+def print_table(rows):
+    columns = ['cold_ingest', 'warm_ingest', 'backfill', 'live_first', 'live_steady']
+    print(f"{'entries':>8} " + ' '.join(f'{column + " s":>14} {"reqs":>7}' for column in columns))
+    for row in rows:
+        print(f"{row['entries']:>8} " + ' '.join(f'{row[column][0]:>14.3f} {row[column][1]:>7}'
+                                               for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated entries per league')
+    parser.add_argument('--leagues', default=str(fpl.DEFAULT_LEAGUE_ID),
+                        help='comma-separated league ids; consecutive leagues share half their entries')
+    parser.add_argument('--gameweek', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0, help='mean seconds added per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failing with 429/503')
+    parser.add_argument('--rate-limit', type=float, default=fpl.RATE_LIMIT,
+                        help='upstream requests per second allowed by the client limiter')
+    args = parser.parse_args()
+    fpl.RATE_LIMIT = args.rate_limit
+    logging.basicConfig(format='%(levelname)s %(name)s: %(message)s')
+    fpl.logger.setLevel(logging.ERROR)
+
+    league_ids = [int(league_id) for league_id in args.leagues.split(',')]
+    rows = []
+    for entries in (int(size) for size in args.sizes.split(',')):
+        rows.append(run_size(entries, league_ids, args.gameweek, args.latency, args.error_rate))
+        print(f"Finished {entries} entries", flush=True)
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,390 @@
+"""Local stand-in for the FPL API.
+
+Serves either a synthetic league of any size or responses recorded from the
+real API, with optional latency and error injection, so fetch_fpl_data can be
+benchmarked and regression-tested offline. Point the app at it with
+FPL_API_BASE=http://127.0.0.1:<port>/api.
+
+    python fake_fpl_api.py --entries 5000 --latency 0.05 --error-rate 0.01
+    python fake_fpl_api.py --record fixtures/   # proxy the real API and save responses
+    python fake_fpl_api.py --replay fixtures/   # serve the saved responses
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, quote, urlparse
+
+import numpy as np
+import requests
+
+# Classic league standings page size used by the real API
+PAGE_SIZE = 50
+
+# Players per position type (GK, DEF, MID, FWD) in each of the 20 clubs
+CLUB_SQUAD = {1: 3, 2: 9, 3: 10, 4: 8}
+
+# Squad slots by position type: a 1-4-4-2 starting XI, then a GK, DEF, MID, FWD bench
+SQUAD_SLOTS = [1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 1, 2, 3, 4]
+
+# Route names used in request statistics
+ROUTES = [
+    ('bootstrap-static', re.compile(r'^/api/bootstrap-static/$')),
+    ('fixtures', re.compile(r'^/api/fixtures/$')),
+    ('event-live', re.compile(r'^/api/event/(\d+)/live/$')),
+    ('standings', re.compile(r'^/api/leagues-classic/(\d+)/standings/$')),
+    ('picks', re.compile(r'^/api/entry/(\d+)/event/(\d+)/picks/$')),
+    ('history', re.compile(r'^/api/entry/(\d+)/history/$')),
+    ('entry', re.compile(r'^/api/entry/(\d+)/$')),
+]
+
+
+class SyntheticLeague:
+    """Deterministic FPL season for a configurable number of entries.
+
+    Every entry keeps one 15-man squad all season. Gameweek points come from
+    the same per-player live points the event live feed serves, so picks,
+    history, standings and live scoring all agree.
+    """
+
+    def __init__(self, entries=20, league_ids=(1658794,), current_gameweek=10,
+                 live=False, seed=1):
+        self.entries = entries
+        self.league_ids = list(league_ids)
+        self.current_gameweek = current_gameweek
+        self.live = live
+        # Consecutive leagues share half their entries
+        self.overlap = entries // 2
+        total_entries = entries + (entries - self.overlap) * (len(self.league_ids) - 1)
+        rng = np.random.default_rng(seed)
+
+        self.element_types = []
+        self.element_teams = []
+        for club in range(1, 21):
+            for element_type, count in CLUB_SQUAD.items():
+                self.element_types += [element_type] * count
+                self.element_teams += [club] * count
+        self.element_types = np.array(self.element_types)
+        self.element_teams = np.array(self.element_teams)
+        element_count = len(self.element_types)
+
+        # Per gameweek and player (ids are index + 1): minutes and points
+        self.minutes = np.where(rng.random((39, element_count)) < 0.8, 90, 0)
+        self.points = np.where(self.minutes > 0, rng.integers(1, 16, (39, element_count)), 0)
+        self.minutes[current_gameweek + 1:] = 0
+        self.points[current_gameweek + 1:] = 0
+
+        # Squads: entries x 15 player ids, drawn from the right position pools
+        pools = {element_type: np.flatnonzero(self.element_types == element_type) + 1
+                 for element_type in CLUB_SQUAD}
+        self.squads = np.column_stack([rng.choice(pools[slot_type], total_entries)
+                                       for slot_type in SQUAD_SLOTS])
+        self.captains = rng.integers(0, 11, total_entries)
+        self.multipliers = np.zeros((total_entries, 15), dtype=np.int64)
+        self.multipliers[:, :11] = 1
+        self.multipliers[np.arange(total_entries), self.captains] = 2
+
+        self.gw_points = np.array([(self.points[gameweek][self.squads - 1] * self.multipliers).sum(axis=1)
+                                   for gameweek in range(39)])
+        self.total_points = np.cumsum(self.gw_points, axis=0)
+        self.values = 1000 + rng.integers(0, 60, total_entries)
+        self.banks = rng.integers(0, 30, total_entries)
+
+    def entry_ids(self, league_id):
+        """Entry ids in a league, sharing the first half with the previous league."""
+        offset = self.league_ids.index(league_id) * (self.entries - self.overlap)
+        return [100000 + offset + i for i in range(self.entries)]
+
+    def index(self, entry_id):
+        index = entry_id - 100000
+        if not 0 <= index < len(self.captains):
+            return None
+        return index
+
+    def event_finished(self, gameweek):
+        return gameweek < self.current_gameweek or (gameweek == self.current_gameweek and not self.live)
+
+    def bootstrap_static(self):
+        start = datetime(2024, 8, 16, 17, 30, tzinfo=timezone.utc)
+        events = []
+        for gameweek in range(1, 39):
+            deadline = start + timedelta(days=7 * (gameweek - 1))
+            events.append({
+                'id': gameweek,
+                'name': f'Gameweek {gameweek}',
+                'deadline_time': deadline.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'finished': self.event_finished(gameweek),
+                'data_checked': self.event_finished(gameweek),
+                'is_previous': gameweek == self.current_gameweek - 1,
+                'is_current': gameweek == self.current_gameweek,
+                'is_next': gameweek == self.current_gameweek + 1,
+            })
+        elements = [{'id': i + 1, 'element_type': int(element_type), 'team': int(team)}
+                    for i, (element_type, team) in enumerate(zip(self.element_types, self.element_teams))]
+        return {'events': events, 'elements': elements}
+
+    def fixtures(self, gameweek):
+        kickoff = datetime(2024, 8, 17, 14, tzinfo=timezone.utc) + timedelta(days=7 * (gameweek - 1))
+        finished = self.event_finished(gameweek)
+        started = gameweek <= self.current_gameweek
+        return [{
+            'id': gameweek * 100 + i,
+            'event': gameweek,
+            'team_h': 2 * i + 1,
+            'team_a': 2 * i + 2,
+            'kickoff_time': kickoff.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'started': started,
+            'finished': finished,
+            'finished_provisional': finished,
+        } for i in range(10)]
+
+    def event_live(self, gameweek):
+        return {'elements': [{
+            'id': i + 1,
+            'stats': {'minutes': int(self.minutes[gameweek][i]),
+                      'total_points': int(self.points[gameweek][i])},
+        } for i in range(len(self.element_types))]}
+
+    def standings(self, league_id, page):
+        if league_id not in self.league_ids:
+            return None
+        entry_ids = self.entry_ids(league_id)
+        totals = self.total_points[self.current_gameweek][[self.index(entry_id) for entry_id in entry_ids]]
+        order = np.argsort(-totals, kind='stable')
+        start = (page - 1) * PAGE_SIZE
+        results = [{
+            'entry': entry_ids[i],
+            'entry_name': f'Team {entry_ids[i]}',
+            'player_name': f'Manager {entry_ids[i]}',
+            'rank': start + position + 1,
+            'total': int(totals[i]),
+        } for position, i in enumerate(order[start:start + PAGE_SIZE])]
+        return {
+            'league': {'id': league_id, 'name': f'League {league_id}'},
+            'standings': {'has_next': start + PAGE_SIZE < len(entry_ids), 'page': page,
+                          'results': results},
+        }
+
+    def entry_history_row(self, index, gameweek):
+        return {
+            'event': gameweek,
+            'points': int(self.gw_points[gameweek][index]),
+            'total_points': int(self.total_points[gameweek][index]),
+            'rank': 1,
+            'value': int(self.values[index]),
+            'bank': int(self.banks[index]),
+            'event_transfers_cost': 0,
+        }
+
+    def picks(self, entry_id, gameweek):
+        index = self.index(entry_id)
+        if index is None or gameweek > self.current_gameweek:
+            return None
+        captain = int(self.captains[index])
+        return {
+            'active_chip': None,
+            'entry_history': self.entry_history_row(index, gameweek),
+            'picks': [{
+                'element': int(element),
+                'position': position + 1,
+                'multiplier': int(self.multipliers[index][position]),
+                'is_captain': position == captain,
+                'is_vice_captain': position == (captain + 1) % 11,
+            } for position, element in enumerate(self.squads[index])],
+        }
+
+    def history(self, entry_id):
+        index = self.index(entry_id)
+        if index is None:
+            return None
+        return {'current': [self.entry_history_row(index, gameweek)
+                            for gameweek in range(1, self.current_gameweek + 1)]}
+
+    def entry(self, entry_id):
+        index = self.index(entry_id)
+        if index is None:
+            return None
+        return {
+            'id': entry_id,
+            'current_event': self.current_gameweek,
+            'summary_event_points': int(self.gw_points[self.current_gameweek][index]),
+            'summary_overall_points': int(self.total_points[self.current_gameweek][index]),
+            'last_deadline_value': int(self.values[index]),
+            'last_deadline_bank': int(self.banks[index]),
+        }
+
+    def respond(self, route, match, query):
+        """Return the JSON body for a matched route, or None for a 404."""
+        if route == 'bootstrap-static':
+            return self.bootstrap_static()
+        if route == 'fixtures':
+            return self.fixtures(int(query.get('event', [self.current_gameweek])[0]))
+        if route == 'event-live':
+            return self.event_live(int(match.group(1)))
+        if route == 'standings':
+            return self.standings(int(match.group(1)), int(query.get('page_standings', [1])[0]))
+        if route == 'picks':
+            return self.picks(int(match.group(1)), int(match.group(2)))
+        if route == 'history':
+            return self.history(int(match.group(1)))
+        if route == 'entry':
+            return self.entry(int(match.group(1)))
+        return None
+
+
+class FakeFPLServer(ThreadingHTTPServer):
+    """HTTP server for the stand-in API with request counting.
+
+    ``source`` is a SyntheticLeague or a directory of recorded responses.
+    With ``upstream`` set, requests are proxied there and saved into
+    ``source`` (record mode).
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address, source=None, upstream=None, latency=0.0,
+                 error_rate=0.0, seed=1):
+        super().__init__(server_address, FakeFPLHandler)
+        self.source = source if source is not None else SyntheticLeague()
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/api'
+
+    def count(self, route, status):
+        with self.stats_lock:
+            self.stats[route] = self.stats.get(route, 0) + 1
+            self.stats['total'] = self.stats.get('total', 0) + 1
+            if status != 200:
+                self.stats[f'status_{status}'] = self.stats.get(f'status_{status}', 0) + 1
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {}
+
+
+class FakeFPLHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None, body=None):
+        body = body if body is not None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        if parsed.path == '/__stats':
+            with server.stats_lock:
+                self.send_json(200, dict(server.stats))
+            return
+        if parsed.path == '/__reset':
+            server.reset_stats()
+            self.send_json(200, {})
+            return
+
+        route, match = next(((name, pattern.match(parsed.path)) for name, pattern in ROUTES
+                             if pattern.match(parsed.path)), ('unknown', None))
+
+        if server.latency:
+            time.sleep(server.latency * (0.5 + server.random.random()))
+        if server.error_rate and server.random.random() < server.error_rate:
+            status = server.random.choice([429, 503])
+            server.count(route, status)
+            self.send_json(status, {'detail': 'injected error'}, {'Retry-After': '1'})
+            return
+
+        payload = self.load(route, match, parsed)
+        if payload is None:
+            server.count(route, 404)
+            self.send_json(404, {'detail': 'Not found.'})
+            return
+
+        # Like the real API's CDN, answer revalidations of unchanged bodies with a 304
+        body = json.dumps(payload).encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            server.count(route, 304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        server.count(route, 200)
+        self.send_json(200, payload, {'ETag': etag}, body)
+
+    def load(self, route, match, parsed):
+        server = self.server
+        if isinstance(server.source, SyntheticLeague):
+            if match is None:
+                return None
+            return server.source.respond(route, match, parse_qs(parsed.query))
+
+        # Recorded responses live in one file per path and query string
+        filename = os.path.join(server.source, quote(self.path, safe='') + '.json')
+        if server.upstream:
+            upstream_path = self.path[len('/api'):] if self.path.startswith('/api') else self.path
+            response = requests.get(server.upstream + upstream_path, timeout=30)
+            if response.status_code != 200:
+                return None
+            payload = response.json()
+            os.makedirs(server.source, exist_ok=True)
+            with open(filename, 'w') as f:
+                json.dump(payload, f)
+            return payload
+        if not os.path.exists(filename):
+            return None
+        with open(filename) as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--entries', type=int, default=20, help='entries per synthetic league')
+    parser.add_argument('--leagues', default='1658794', help='comma-separated league ids')
+    parser.add_argument('--current-gameweek', type=int, default=10)
+    parser.add_argument('--live', action='store_true', help='leave the current gameweek in progress')
+    parser.add_argument('--latency', type=float, default=0.0, help='mean seconds added per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failing with 429/503')
+    parser.add_argument('--record', metavar='DIR', help='proxy the real API and save responses to DIR')
+    parser.add_argument('--replay', metavar='DIR', help='serve responses saved in DIR')
+    parser.add_argument('--upstream', default='https://fantasy.premierleague.com/api')
+    args = parser.parse_args()
+
+    if args.record:
+        source, upstream = args.record, args.upstream
+    elif args.replay:
+        source, upstream = args.replay, None
+    else:
+        source = SyntheticLeague(args.entries, [int(league_id) for league_id in args.leagues.split(',')],
+                                 args.current_gameweek, args.live)
+        upstream = None
+
+    server = FakeFPLServer(('127.0.0.1', args.port), source, upstream, args.latency, args.error_rate)
+    print(f"Fake FPL API listening on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
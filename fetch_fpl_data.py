@@ -1,31 +1,341 @@
-import requests
-import csv
-import datetime
 import os
-import pandas as pd
-import urllib3
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import json
 from urllib.parse import parse_qs, urlparse
 import sqlite3
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import sys
 import threading
+import functools
+import itertools
+import gzip
+import hashlib
+import io
+import logging
+import queue
+import random
+import re
+import selectors
+import socket
+import zlib
+from array import array
+from email.utils import format_datetime, parsedate_to_datetime
+from concurrent.futures import Future, ThreadPoolExecutor
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+try:
+    import brotli
+except ImportError:  # Optional: serve gzip only when brotli isn't installed
+    brotli = None
+
+# requests, numpy and pandas take most of a second to import, so they are
+# imported inside the functions that need them and the port binds without them
+
+logger = logging.getLogger('fpl')
+
+# Log level name (DEBUG shows every request); OFF silences the app's logging
+LOG_LEVEL = os.environ.get('FPL_LOG_LEVEL', 'INFO').upper()
+
+# Root of the FPL API; point it at fake_fpl_api.py to run without the real service
+FPL_API_BASE = os.environ.get('FPL_API_BASE', 'https://fantasy.premierleague.com/api').rstrip('/')
+
+# Maximum number of concurrent upstream requests when fanning out per-team fetches
+FETCH_WORKERS = int(os.environ.get('FPL_FETCH_WORKERS', 16))
+
+# Upstream request budget: the limiter starts at FPL_RATE_LIMIT requests per
+# second, backs off multiplicatively on 429s and creeps back up on success
+RATE_LIMIT = float(os.environ.get('FPL_RATE_LIMIT', 50))
+MIN_RATE_LIMIT = 1.0
+
+# Seconds to wait for an upstream connection and response
+REQUEST_TIMEOUT = float(os.environ.get('FPL_REQUEST_TIMEOUT', 10))
+
+# Retries after the first attempt for throttled, failing or timed-out requests
+MAX_RETRIES = int(os.environ.get('FPL_MAX_RETRIES', 4))
+RETRY_BACKOFF = 0.5
+MAX_RETRY_DELAY = 30
+
+# Responses worth retrying; anything else that isn't a 200 is final
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Awards stored for every gameweek
+AWARD_TYPES = ('weekly_champion', 'wooden_spoon', 'gameweek_champion')
+
+# Serve an expired gameweek JSON cache file while it is refetched in the background
+SERVE_STALE = os.environ.get('FPL_SERVE_STALE', '1') != '0'
+
+# Seconds before a season backfill that failed on the request path is tried again
+BACKFILL_RETRY_AFTER = float(os.environ.get('FPL_BACKFILL_RETRY_AFTER', 300))
+
+# Gameweeks summed into a manager's form on /api/team/<id>/history
+FORM_GAMEWEEKS = max(1, int(os.environ.get('FPL_FORM_GAMEWEEKS', 5)))
+
+# Streamed /api/all-data bodies up to this size are also kept whole in the response cache
+STREAM_CACHE_LIMIT = int(os.environ.get('FPL_STREAM_CACHE_LIMIT', 4 * 1024 * 1024))
+
+# Seconds between keep-alive comments on idle /api/stream connections
+STREAM_HEARTBEAT = 20
+
+# Bytes of unsent events an /api/stream subscriber may fall behind before it is dropped
+STREAM_BUFFER_LIMIT = int(os.environ.get('FPL_STREAM_BUFFER_LIMIT', 1024 * 1024))
+
+# Number of worker threads serving HTTP requests; idle keep-alive connections
+# are parked without a worker, so this bounds concurrent requests, not sockets
+HTTP_WORKERS = int(os.environ.get('FPL_HTTP_WORKERS', 32))
+
+# How many of those workers may serve responses that can wait on the FPL API;
+# further such requests get a 503 so static and cached responses always have a worker
+UPSTREAM_WORKERS = int(os.environ.get('FPL_UPSTREAM_WORKERS', HTTP_WORKERS // 2))
+
+# Bytes of a request head the idle watcher reads ahead before handing it to a worker
+MAX_REQUEST_HEAD = 64 * 1024
+
+# Static files served from memory: request path -> (file, content type)
+STATIC_FILES = {
+    '/': ('index.html', 'text/html'),
+    '/styles.css': ('styles.css', 'text/css'),
+    '/script.js': ('script.js', 'application/javascript'),
+}
+
+# Classic league that held all data before leagues and seasons were stored
+DEFAULT_LEAGUE_ID = 1658794
+
+# Classic leagues tracked by this app; the first one backs the unscoped /api routes
+LEAGUE_IDS = [int(league_id) for league_id in
+              os.environ.get('FPL_LEAGUE_IDS', str(DEFAULT_LEAGUE_ID)).split(',')]
+LEAGUE_ID = LEAGUE_IDS[0]
+
+def default_season(today=None):
+    """Name the FPL season running on ``today``, e.g. '2024-25' (seasons start in July)."""
+    today = today or datetime.now()
+    start_year = today.year if today.month >= 7 else today.year - 1
+    return f'{start_year}-{(start_year + 1) % 100:02d}'
+
+# Season that new data is stored under and that the API serves
+SEASON = os.environ.get('FPL_SEASON') or default_season()
+
+# Season for rows migrated from the unkeyed schema; by default each row's
+# season is worked out from its timestamp
+LEGACY_SEASON = os.environ.get('FPL_LEGACY_SEASON')
+
+def legacy_season(timestamp):
+    """Season of a legacy row stored at ``timestamp`` (SQLite CURRENT_TIMESTAMP text)."""
+    if LEGACY_SEASON:
+        return LEGACY_SEASON
+    try:
+        return default_season(datetime.strptime(timestamp[:19], '%Y-%m-%d %H:%M:%S'))
+    except (TypeError, ValueError):
+        return SEASON
+
+# How long bootstrap-static event metadata is reused before refetching (seconds)
+EVENTS_TTL = int(os.environ.get('FPL_EVENTS_TTL', 300))
+
+# Refresh scheduler intervals (seconds): while matches are live, while the
+# gameweek's results settle, when event metadata is unavailable, and the
+# longest the refresher ever sleeps
+LIVE_REFRESH_INTERVAL = int(os.environ.get('FPL_LIVE_REFRESH_INTERVAL', 60))
+SETTLING_REFRESH_INTERVAL = int(os.environ.get('FPL_SETTLING_REFRESH_INTERVAL', 1800))
+DEFAULT_REFRESH_INTERVAL = 300
+MAX_REFRESH_INTERVAL = int(os.environ.get('FPL_MAX_REFRESH_INTERVAL', 6 * 3600))
+
+# Raw upstream responses that are neither immutable nor refetched within this
+# many seconds are dropped from the response cache at startup
+UPSTREAM_CACHE_RETENTION = int(os.environ.get('FPL_UPSTREAM_CACHE_RETENTION', 7 * 86400))
+
+# SQLite database holding standings and award history
+DB_PATH = os.environ.get('FPL_DB_PATH', 'fpl_history.db')
+
+_db_local = threading.local()
+_session = None
+_fetch_pool = None
+_fetch_lock = threading.Lock()
+_rate_limiter = {'rate': RATE_LIMIT, 'tokens': 1.0, 'updated': 0.0, 'paused_until': 0.0}
+_rate_limiter_lock = threading.Lock()
+_backfilled_leagues = set()
+# League id -> time its last request-path backfill failed
+_backfill_failures = {}
+_events_cache = {'events': None, 'elements': None, 'fetched_at': 0}
+_events_lock = threading.Lock()
+# Gameweeks fetched after their event was finished and data_checked
+_finalized_gameweeks = set()
+# Picks and league membership for the gameweek being scored live; both are
+# fixed once the deadline passes, so they are fetched once per gameweek
+_live_picks = {'gameweek': None, 'picks': {}, 'leagues': {}}
+_live_picks_lock = threading.Lock()
+_fixtures_cache = {}
+
+# Serialized API responses keyed by (league, gameweek), plus (league, 'all') for
+# the full season and (league, gameweek, 'changed-at') for Last-Modified stamps.
+# Entries live until a write to that gameweek or the one before it.
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+_response_cache_generation = 0
+
+# Identifies this process in API ETags so versions from before a restart never match
+_data_version_prefix = '%x' % int(time.time())
+_compressed_responses = {}
+
+_static_assets = {}
+_static_lock = threading.Lock()
+
+# In-flight gameweek loads and stores keyed by (kind, gameweek, league_id)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Set once the startup warm-up has finished; the refresh thread runs once per process
+_ready = threading.Event()
+_refresh_thread = None
+_refresh_lock = threading.Lock()
+
+# Prometheus metrics kept in process: counters and gauges are keyed by
+# (name, labels); histograms also keep per-bucket counts, a sum and a count
+METRIC_TYPES = {
+    'fpl_http_requests_total': ('counter', 'HTTP requests served, by route and status'),
+    'fpl_http_request_duration_seconds': ('histogram', 'Time to serve an HTTP request, by route'),
+    'fpl_upstream_requests_total': ('counter', 'FPL API requests, by endpoint and status'),
+    'fpl_upstream_request_duration_seconds': ('histogram', 'FPL API request latency, by endpoint'),
+    'fpl_db_query_duration_seconds': ('histogram', 'Time spent in SQLite helpers, by helper'),
+    'fpl_cache_requests_total': ('counter', 'Cache lookups, by cache and result'),
+    'fpl_rows_written_total': ('counter', 'Rows written to SQLite, by table'),
+    'fpl_refresh_duration_seconds': ('histogram', 'Duration of a periodic refresh cycle'),
+    'fpl_refresh_failures_total': ('counter', 'Refresh cycles that failed or stored nothing'),
+    'fpl_refresh_last_success_timestamp_seconds': ('gauge', 'Unix time of the last successful refresh'),
+    'fpl_stream_clients': ('gauge', 'Open /api/stream connections'),
+}
+METRIC_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def inc_counter(name, labels=(), value=1):
+    """Add ``value`` to a counter; ``labels`` is a tuple of (label, value) pairs."""
+    with _metrics_lock:
+        _metrics[(name, labels)] = _metrics.get((name, labels), 0) + value
+
+def set_gauge(name, value, labels=()):
+    with _metrics_lock:
+        _metrics[(name, labels)] = value
+
+def observe(name, value, labels=()):
+    """Record one observation in a histogram."""
+    with _metrics_lock:
+        histogram = _metrics.get((name, labels))
+        if histogram is None:
+            histogram = _metrics[(name, labels)] = [[0] * len(METRIC_BUCKETS), 0.0, 0]
+        for i, bound in enumerate(METRIC_BUCKETS):
+            if value <= bound:
+                histogram[0][i] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+def timed(name, label=None):
+    """Decorator recording a function's duration in histogram ``name``.
+
+    The histogram is labelled with the function's name under ``label``.
+    """
+    def decorate(function):
+        labels = ((label, function.__name__),) if label else ()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, labels)
+        return wrapper
+    return decorate
+
+def format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+def render_metrics():
+    """Render all metrics in the Prometheus text exposition format."""
+    set_gauge('fpl_stream_clients', len(_stream_clients))
+    with _metrics_lock:
+        snapshot = {key: (list(value[0]), value[1], value[2]) if isinstance(value, list) else value
+                    for key, value in _metrics.items()}
+
+    lines = []
+    for name, (metric_type, help_text) in METRIC_TYPES.items():
+        series = sorted((labels, value) for (metric, labels), value in snapshot.items()
+                        if metric == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in series:
+            if metric_type != 'histogram':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            buckets, total, count = value
+            for bound, bucket_count in zip(METRIC_BUCKETS, buckets):
+                lines.append(f'{name}_bucket{format_labels(labels, (("le", bound),))} {bucket_count}')
+            lines.append(f'{name}_bucket{format_labels(labels, (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{format_labels(labels)} {total}')
+            lines.append(f'{name}_count{format_labels(labels)} {count}')
+    return ('\n'.join(lines) + '\n').encode()
+
+def upstream_endpoint(url):
+    """Collapse an FPL API URL into a low-cardinality endpoint label."""
+    path = urlparse(url).path
+    if path.startswith(urlparse(FPL_API_BASE).path):
+        path = path[len(urlparse(FPL_API_BASE).path):]
+    return re.sub(r'/\d+', '/:id', path)
+
+def get_db():
+    """Return this thread's SQLite connection, opening and tuning it on first use.
+
+    Connections stay open for the life of the thread, so a request or refresh
+    pays for one open and reuses prepared statements. WAL mode lets readers
+    keep serving while the refresher writes.
+    """
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=30, cached_statements=256)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-16000')
+        _db_local.conn = conn
+    return conn
 
 # Initialize SQLite database for historical data
 def init_db():
     """Initialize the SQLite database for storing historical FPL data."""
-    print("Starting database initialization...")
+    logger.debug("Starting database initialization...")
     try:
-        conn = sqlite3.connect('fpl_history.db')
+        conn = get_db()
         c = conn.cursor()
+        c.execute('BEGIN')
+        
+        # Tables from before leagues and seasons were keyed are moved aside and copied back in
+        legacy_tables = []
+        indexes = {'fpl_data': 'idx_fpl_data_team', 'award_winners': 'idx_award_winners_type'}
+        for table in ('fpl_data', 'award_winners'):
+            columns = [row[1] for row in c.execute(f'PRAGMA table_info({table})')]
+            if columns and 'league_id' not in columns:
+                c.execute(f'ALTER TABLE {table} RENAME TO {table}_legacy')
+                c.execute(f'DROP INDEX IF EXISTS {indexes[table]}')
+                legacy_tables.append(table)
+
+        # Award winners used to keep one row per award, losing shared awards
+        primary_key = [row[1] for row in c.execute('PRAGMA table_info(award_winners)') if row[5]]
+        rekey_awards = bool(primary_key) and 'team_id' not in primary_key
+        if rekey_awards:
+            c.execute('ALTER TABLE award_winners RENAME TO award_winners_unkeyed')
+            c.execute('DROP INDEX IF EXISTS idx_award_winners_type')
         
         # Create main data table
         c.execute('''CREATE TABLE IF NOT EXISTS fpl_data
-                     (gameweek INTEGER,
+                     (league_id INTEGER,
+                      season TEXT,
+                      gameweek INTEGER,
                       team_id INTEGER,
                       team_name TEXT,
                       manager_name TEXT,
@@ -35,161 +345,1018 @@ def init_db():
                       team_value REAL,
                       bank_balance REAL,
                       timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                      PRIMARY KEY (gameweek, team_id))''')
-        print("Created fpl_data table")
+                      PRIMARY KEY (league_id, season, gameweek, team_id))''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_fpl_data_team
+                     ON fpl_data (league_id, season, team_id, gameweek)''')
+        logger.debug("Created fpl_data table")
         
         # Create award winners table
         c.execute('''CREATE TABLE IF NOT EXISTS award_winners
-                     (gameweek INTEGER,
+                     (league_id INTEGER,
+                      season TEXT,
+                      gameweek INTEGER,
                       award_type TEXT,
                       team_id INTEGER,
                       team_name TEXT,
                       manager_name TEXT,
                       points INTEGER,
-                      PRIMARY KEY (gameweek, award_type))''')
-        print("Created award_winners table")
+                      PRIMARY KEY (league_id, season, gameweek, award_type, team_id))''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_award_winners_type
+                     ON award_winners (league_id, season, award_type, gameweek)''')
+        logger.debug("Created award_winners table")
+
+        # Raw upstream responses, zlib-compressed, with their HTTP validators
+        c.execute('''CREATE TABLE IF NOT EXISTS upstream_cache
+                     (season TEXT,
+                      url TEXT,
+                      body BLOB,
+                      etag TEXT,
+                      last_modified TEXT,
+                      fetched_at REAL,
+                      immutable INTEGER,
+                      PRIMARY KEY (season, url))''')
+        c.execute('''DELETE FROM upstream_cache
+                     WHERE season != ? OR (NOT immutable AND fetched_at < ?)''',
+                  (SEASON, time.time() - UPSTREAM_CACHE_RETENTION))
+
+        # Each manager's season with rolling aggregates, maintained by store_fpl_data
+        c.execute('''CREATE TABLE IF NOT EXISTS team_history
+                     (league_id INTEGER,
+                      season TEXT,
+                      team_id INTEGER,
+                      gameweek INTEGER,
+                      team_name TEXT,
+                      manager_name TEXT,
+                      gw_points INTEGER,
+                      total_points INTEGER,
+                      rank INTEGER,
+                      rank_change INTEGER,
+                      team_value REAL,
+                      bank_balance REAL,
+                      form INTEGER,
+                      best_gameweek INTEGER,
+                      best_points INTEGER,
+                      worst_gameweek INTEGER,
+                      worst_points INTEGER,
+                      PRIMARY KEY (league_id, season, team_id, gameweek))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS team_award_counts
+                     (league_id INTEGER,
+                      season TEXT,
+                      team_id INTEGER,
+                      award_type TEXT,
+                      wins INTEGER,
+                      PRIMARY KEY (league_id, season, team_id, award_type))''')
+
+        # Bumped whenever a write actually changes a gameweek's standings
+        c.execute('''CREATE TABLE IF NOT EXISTS gameweek_versions
+                     (league_id INTEGER,
+                      season TEXT,
+                      gameweek INTEGER,
+                      version INTEGER,
+                      changed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                      PRIMARY KEY (league_id, season, gameweek))''')
+        
+        # Legacy rows keep the season they were stored in, not today's
+        legacy_seasons = set()
+        gameweek_seasons = {}
+        if 'fpl_data' in legacy_tables:
+            rows = []
+            for row in c.execute('''SELECT gameweek, team_id, team_name, manager_name, gw_points,
+                                           total_points, rank, team_value, bank_balance, timestamp
+                                    FROM fpl_data_legacy''').fetchall():
+                season = legacy_season(row[-1])
+                gameweek_seasons[row[0]] = max(season, gameweek_seasons.get(row[0], season))
+                rows.append((DEFAULT_LEAGUE_ID, season) + tuple(row))
+            c.executemany('INSERT OR REPLACE INTO fpl_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                          rows)
+            legacy_seasons.update(row[1] for row in rows)
+            c.execute('DROP TABLE fpl_data_legacy')
+        if 'award_winners' in legacy_tables:
+            # Award rows have no timestamp; they take the season of their gameweek's standings
+            rows = [(DEFAULT_LEAGUE_ID, gameweek_seasons.get(row[0], LEGACY_SEASON or SEASON)) + tuple(row)
+                    for row in c.execute('''SELECT gameweek, award_type, team_id, team_name,
+                                                   manager_name, points
+                                            FROM award_winners_legacy''').fetchall()]
+            c.executemany('INSERT OR REPLACE INTO award_winners VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            legacy_seasons.update(row[1] for row in rows)
+            c.execute('DROP TABLE award_winners_legacy')
+        if rekey_awards:
+            c.execute('''INSERT OR REPLACE INTO award_winners
+                         SELECT league_id, season, gameweek, award_type, team_id, team_name,
+                                manager_name, points
+                         FROM award_winners_unkeyed''')
+            c.execute('DROP TABLE award_winners_unkeyed')
+        if legacy_tables:
+            logger.info(f"Migrated {legacy_tables} to league {DEFAULT_LEAGUE_ID}, "
+                        f"seasons {sorted(legacy_seasons)}")
+
+        # Build the per-team tables for leagues stored before they existed
+        unbuilt = [row[0] for row in c.execute('''SELECT DISTINCT league_id FROM fpl_data
+                                                   WHERE season = ? AND league_id NOT IN
+                                                       (SELECT league_id FROM team_history
+                                                        WHERE season = ?)''', (SEASON, SEASON))]
+        for league_id in unbuilt:
+            update_team_history(1, league_id=league_id)
+            update_team_award_counts(league_id)
+        if unbuilt:
+            logger.info(f"Built team history for leagues {unbuilt}")
         
         conn.commit()
-        conn.close()
-        print("Database initialization complete")
+        logger.debug("Database initialization complete")
     except Exception as e:
-        print(f"Error initializing database: {e}")
+        logger.error(f"Error initializing database: {e}")
         raise
 
-def store_fpl_data(gameweek, data):
-    """Store FPL data in the database."""
-    conn = sqlite3.connect('fpl_history.db')
-    c = conn.cursor()
-    
-    for team in data:
-        c.execute('''INSERT OR REPLACE INTO fpl_data 
-                    (gameweek, team_id, team_name, manager_name, gw_points, 
-                     total_points, rank, team_value, bank_balance)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                 (gameweek, team['team_id'], team['team_name'], 
-                  team['manager_name'], team['gw_points'], team['total_points'],
-                  team['rank'], team['team_value'], team['bank_balance']))
-    
-    conn.commit()
-    conn.close()
+# Sentinel in Standings.rank_change for teams missing from the previous gameweek
+NO_RANK_CHANGE = -(1 << 63)
 
-def store_award_winners(gameweek, data, gameweek_champions):
-    """Store award winners in the database."""
-    conn = sqlite3.connect('fpl_history.db')
-    c = conn.cursor()
-    
+class Standings:
+    """One league gameweek's standings, stored column by column.
+
+    Numbers live in typed arrays and names are interned, so a team costs a
+    few machine words instead of a dict of boxed values, and a manager's name
+    is shared by every gameweek that mentions it. ``rows()`` yields the
+    per-team dicts of the API response.
+    """
+    FIELDS = ('team_id', 'team_name', 'manager_name', 'gw_points', 'total_points',
+              'rank', 'team_value', 'bank_balance')
+    __slots__ = FIELDS + ('rank_change',)
+
+    def __init__(self, records=()):
+        self.team_id = array('q')
+        self.team_name = []
+        self.manager_name = []
+        self.gw_points = array('q')
+        self.total_points = array('q')
+        self.rank = array('q')
+        self.team_value = array('d')
+        self.bank_balance = array('d')
+        self.rank_change = array('q')
+        for record in records:
+            self.append(*record)
+
+    def __len__(self):
+        return len(self.team_id)
+
+    def append(self, team_id, team_name, manager_name, gw_points, total_points, rank,
+               team_value, bank_balance):
+        self.team_id.append(team_id)
+        self.team_name.append(sys.intern(team_name))
+        self.manager_name.append(sys.intern(manager_name))
+        self.gw_points.append(gw_points)
+        self.total_points.append(total_points)
+        self.rank.append(rank)
+        self.team_value.append(team_value)
+        self.bank_balance.append(bank_balance)
+        self.rank_change.append(NO_RANK_CHANGE)
+
+    def records(self):
+        """Iterate over the teams as tuples in FIELDS order."""
+        return zip(self.team_id, self.team_name, self.manager_name, self.gw_points,
+                   self.total_points, self.rank, self.team_value, self.bank_balance)
+
+    def row(self, index):
+        """Return one team in the response shape."""
+        team = {field: getattr(self, field)[index] for field in self.FIELDS}
+        if self.rank_change[index] != NO_RANK_CHANGE:
+            team['rank_change'] = self.rank_change[index]
+        return team
+
+    def rows(self):
+        """Iterate over the teams in the response shape."""
+        for record, rank_change in zip(self.records(), self.rank_change):
+            team = dict(zip(self.FIELDS, record))
+            if rank_change != NO_RANK_CHANGE:
+                team['rank_change'] = rank_change
+            yield team
+
+    def take(self, order):
+        """Return the teams at the positions in ``order`` as new Standings."""
+        taken = Standings()
+        for field in self.__slots__:
+            column = getattr(self, field)
+            values = [column[index] for index in order]
+            setattr(taken, field, array(column.typecode, values) if isinstance(column, array) else values)
+        return taken
+
+    def has_points(self):
+        return any(points > 0 for points in self.gw_points)
+
+    def set_rank_changes(self, previous_ranks):
+        """Set rank changes from a {team_id: rank} mapping of the previous gameweek."""
+        for index, (team_id, rank) in enumerate(zip(self.team_id, self.rank)):
+            previous_rank = previous_ranks.get(team_id)
+            self.rank_change[index] = NO_RANK_CHANGE if previous_rank is None else previous_rank - rank
+
+def json_default(value):
+    """Let json.dumps encode Standings in the response shape."""
+    if isinstance(value, Standings):
+        return list(value.rows())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def store_fpl_data(gameweek, data, league_id=LEAGUE_ID, gameweek_champions=None):
+    """Store FPL data in the database, writing only rows that differ from the stored ones.
+
+    Returns the number of rows written. When any changed, the gameweek's
+    version is bumped and its cached responses are dropped. Passing
+    ``gameweek_champions`` also rewrites the gameweek's award winners and the
+    next gameweek's champion in the same transaction, so stored awards can
+    never fall behind the standings they were calculated from.
+    """
+    conn = get_db()
+    stored = {row[0]: row[1:] for row in conn.execute(
+        '''SELECT team_id, team_name, manager_name, gw_points, total_points, rank,
+                  team_value, bank_balance
+           FROM fpl_data WHERE league_id = ? AND season = ? AND gameweek = ?''',
+        (league_id, SEASON, gameweek))}
+    changed = [row for row in data.records() if stored.get(row[0]) != row[1:]]
+    inc_counter('fpl_rows_written_total', (('table', 'fpl_data'),), len(changed))
+    if not changed:
+        return 0
+
+    with conn:
+        conn.executemany('''INSERT OR REPLACE INTO fpl_data 
+                            (league_id, season, gameweek, team_id, team_name, manager_name,
+                             gw_points, total_points, rank, team_value, bank_balance)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                         [(league_id, SEASON, gameweek) + row for row in changed])
+        update_team_history(gameweek, [row[0] for row in changed], league_id)
+        if gameweek_champions is not None:
+            write_award_winners(gameweek, data, gameweek_champions, league_id)
+            refresh_gameweek_champion(gameweek + 1, data, league_id)
+            update_team_award_counts(league_id)
+        conn.execute('''INSERT INTO gameweek_versions (league_id, season, gameweek, version)
+                        VALUES (?, ?, ?, 1)
+                        ON CONFLICT (league_id, season, gameweek)
+                        DO UPDATE SET version = version + 1, changed_at = CURRENT_TIMESTAMP''',
+                     (league_id, SEASON, gameweek))
+    invalidate_response_cache(gameweek, league_id)
+    return len(changed)
+
+def get_gameweek_version(gameweek, league_id=LEAGUE_ID):
+    """Return (version, changed_at) of a gameweek's stored standings, or (0, None)."""
+    row = get_db().execute('''SELECT version, changed_at FROM gameweek_versions
+                              WHERE league_id = ? AND season = ? AND gameweek = ?''',
+                           (league_id, SEASON, gameweek)).fetchone()
+    return tuple(row) if row else (0, None)
+
+def get_gameweek_changed_at(gameweek, league_id=LEAGUE_ID):
+    """Return when a gameweek's response last changed as an aware datetime, or None.
+
+    The response also depends on the previous gameweek (rank changes and the
+    gameweek champion), so the later of the two stamps is used. The result is
+    kept in the response cache and dropped with the gameweek's body.
+    """
+    key = (league_id, gameweek, 'changed-at')
+    changed_at = _response_cache.get(key)
+    if changed_at is not None:
+        return changed_at
+    generation = _response_cache_generation
+    stamps = [get_gameweek_version(week, league_id)[1] for week in (gameweek - 1, gameweek)]
+    stamps = [stamp for stamp in stamps if stamp]
+    if not stamps:
+        return None
+    changed_at = datetime.strptime(max(stamps), '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    _store_response(key, changed_at, generation)
+    return changed_at
+
+def award_rows(gameweek, data, award_type, winners, league_id=LEAGUE_ID):
+    """Build award_winners rows for one award's winners from ``data``."""
+    team_ids = dict(zip(data.team_name, data.team_id))
+    return [(league_id, SEASON, gameweek, award_type, team_ids.get(winner['team_name']),
+             winner['team_name'], winner['manager_name'], winner['points'])
+            for winner in winners]
+
+def write_award_winners(gameweek, data, gameweek_champions, league_id=LEAGUE_ID):
+    """Replace a gameweek's award winners; runs inside the caller's transaction."""
     # Calculate all awards
     awards = calculate_awards(data)
-    
-    # Store weekly champions
-    for champion in awards['weekly_champion']:
-        c.execute('''INSERT OR REPLACE INTO award_winners 
-                    (gameweek, award_type, team_id, team_name, manager_name, points)
-                    VALUES (?, ?, ?, ?, ?, ?)''',
-                 (gameweek, 'weekly_champion', 
-                  next((team['team_id'] for team in data 
-                       if team['team_name'] == champion['team_name']), None),
-                  champion['team_name'], champion['manager_name'], champion['points']))
-    
-    # Store wooden spoons
-    for spoon in awards['wooden_spoon']:
-        c.execute('''INSERT OR REPLACE INTO award_winners 
-                    (gameweek, award_type, team_id, team_name, manager_name, points)
-                    VALUES (?, ?, ?, ?, ?, ?)''',
-                 (gameweek, 'wooden_spoon',
-                  next((team['team_id'] for team in data 
-                       if team['team_name'] == spoon['team_name']), None),
-                  spoon['team_name'], spoon['manager_name'], spoon['points']))
-    
-    # Store gameweek champions
-    for champion in gameweek_champions:
-        c.execute('''INSERT OR REPLACE INTO award_winners 
-                    (gameweek, award_type, team_id, team_name, manager_name, points)
-                    VALUES (?, ?, ?, ?, ?, ?)''',
-                 (gameweek, 'gameweek_champion',
-                  next((team['team_id'] for team in data 
-                       if team['team_name'] == champion['team_name']), None),
-                  champion['team_name'], champion['manager_name'], champion['points']))
-    
-    conn.commit()
-    conn.close()
+    rows = (award_rows(gameweek, data, 'weekly_champion', awards['weekly_champion'], league_id)
+            + award_rows(gameweek, data, 'wooden_spoon', awards['wooden_spoon'], league_id)
+            + award_rows(gameweek, data, 'gameweek_champion', gameweek_champions, league_id))
+    conn = get_db()
+    conn.execute('DELETE FROM award_winners WHERE league_id = ? AND season = ? AND gameweek = ?',
+                 (league_id, SEASON, gameweek))
+    conn.executemany('''INSERT OR REPLACE INTO award_winners 
+                        (league_id, season, gameweek, award_type, team_id, team_name,
+                         manager_name, points)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+
+def refresh_gameweek_champion(gameweek, previous_data, league_id=LEAGUE_ID):
+    """Recalculate a stored gameweek's champion after the gameweek before it changed.
 
-def get_award_winners(gameweek, award_type=None):
+    Does nothing if ``gameweek`` has no scored standings yet. Runs inside the
+    caller's transaction.
+    """
+    current_data = get_historical_data(gameweek, league_id)
+    if not current_data.has_points():
+        return
+    champions = calculate_gameweek_champion(gameweek, current_data, previous_data)
+    conn = get_db()
+    conn.execute('''DELETE FROM award_winners
+                    WHERE league_id = ? AND season = ? AND gameweek = ? AND award_type = ?''',
+                 (league_id, SEASON, gameweek, 'gameweek_champion'))
+    conn.executemany('''INSERT OR REPLACE INTO award_winners 
+                        (league_id, season, gameweek, award_type, team_id, team_name,
+                         manager_name, points)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                     award_rows(gameweek, current_data, 'gameweek_champion', champions, league_id))
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def store_season_awards(winners, league_id=LEAGUE_ID):
+    """Store a winners frame from find_award_winners for many gameweeks in one transaction."""
+    rows = [(league_id, SEASON, gameweek, award_type, team_id, team_name, manager_name, points)
+            for gameweek, award_type, team_id, team_name, manager_name, points in zip(
+                winners['gameweek'].tolist(), winners['award_type'].tolist(),
+                winners['team_id'].tolist(), winners['team_name'].tolist(),
+                winners['manager_name'].tolist(), winners['points'].tolist())]
+    conn = get_db()
+    with conn:
+        conn.executemany('DELETE FROM award_winners WHERE league_id = ? AND season = ? AND gameweek = ?',
+                         [(league_id, SEASON, gameweek) for gameweek in set(winners['gameweek'].tolist())])
+        conn.executemany('''INSERT OR REPLACE INTO award_winners 
+                            (league_id, season, gameweek, award_type, team_id, team_name,
+                             manager_name, points)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+        update_team_award_counts(league_id)
+    for gameweek in set(winners['gameweek'].tolist()):
+        invalidate_response_cache(gameweek, league_id)
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def get_award_winners(gameweek, award_type=None, league_id=LEAGUE_ID):
     """Retrieve award winners for a specific gameweek and optionally filter by award type."""
-    conn = sqlite3.connect('fpl_history.db')
-    c = conn.cursor()
+    c = get_db().cursor()
     
     if award_type:
-        c.execute('''SELECT * FROM award_winners WHERE gameweek = ? AND award_type = ?''', 
-                 (gameweek, award_type))
+        c.execute('''SELECT team_name, manager_name, points FROM award_winners
+                     WHERE league_id = ? AND season = ? AND gameweek = ? AND award_type = ?''', 
+                 (league_id, SEASON, gameweek, award_type))
     else:
-        c.execute('''SELECT * FROM award_winners WHERE gameweek = ?''', (gameweek,))
+        c.execute('''SELECT team_name, manager_name, points FROM award_winners
+                     WHERE league_id = ? AND season = ? AND gameweek = ?''',
+                 (league_id, SEASON, gameweek))
     
     winners = []
     for row in c.fetchall():
         winners.append({
-            'team_name': row[3],
-            'manager_name': row[4],
-            'points': row[5]
+            'team_name': row[0],
+            'manager_name': row[1],
+            'points': row[2]
         })
     
-    conn.close()
     return winners
 
-def get_historical_data(gameweek):
+@timed('fpl_db_query_duration_seconds', 'helper')
+def get_awards_history(award_type, league_id=LEAGUE_ID):
+    """Every winner of one award this season, newest first, with each team's win count."""
+    c = get_db().cursor()
+    c.execute('''SELECT gameweek, team_id, team_name, manager_name, points,
+                        COUNT(*) OVER (PARTITION BY team_id) AS wins
+                 FROM award_winners
+                 WHERE league_id = ? AND season = ? AND award_type = ?
+                 ORDER BY gameweek DESC, team_name''',
+              (league_id, SEASON, award_type))
+    return [{
+        'gameweek': row[0],
+        'team_id': row[1],
+        'team_name': row[2],
+        'manager_name': row[3],
+        'points': row[4],
+        'wins': row[5]
+    } for row in c.fetchall()]
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def update_team_history(gameweek, team_ids=None, league_id=LEAGUE_ID):
+    """Recompute team_history from ``gameweek`` on for ``team_ids`` (None: every team).
+
+    Only what a write to ``gameweek`` can change is read: the form window and
+    previous rank before it, the running best and worst weeks from the last
+    history row before it, and every later gameweek, since those aggregates
+    chain forward. Runs inside the caller's transaction.
+    """
+    conn = get_db()
+    team_filter = ''
+    if team_ids is not None:
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS history_teams (team_id INTEGER PRIMARY KEY)')
+        conn.execute('DELETE FROM history_teams')
+        conn.executemany('INSERT OR IGNORE INTO history_teams VALUES (?)',
+                         ((team_id,) for team_id in team_ids))
+        team_filter = 'AND team_id IN (SELECT team_id FROM history_teams)'
+    start = gameweek - max(FORM_GAMEWEEKS - 1, 1)
+
+    # MAX() picks the bare columns from each team's latest row in the window
+    seeds = {row[0]: row[2:] for row in conn.execute(f'''
+        SELECT team_id, MAX(gameweek), best_gameweek, best_points, worst_gameweek, worst_points
+        FROM team_history
+        WHERE league_id = ? AND season = ? AND gameweek >= ? AND gameweek < ? {team_filter}
+        GROUP BY team_id''', (league_id, SEASON, start, gameweek))}
+
+    rows = conn.execute(f'''SELECT team_id, gameweek, team_name, manager_name, gw_points,
+                                   total_points, rank, team_value, bank_balance
+                            FROM fpl_data
+                            WHERE league_id = ? AND season = ? AND gameweek >= ? {team_filter}
+                            ORDER BY team_id, gameweek''', (league_id, SEASON, start))
+    history = []
+    for team_id, team_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        if team_id not in seeds and gameweek > 1:
+            # A gap longer than the window: fall back to the team's last earlier row
+            seed = conn.execute('''SELECT best_gameweek, best_points, worst_gameweek, worst_points
+                                   FROM team_history
+                                   WHERE league_id = ? AND season = ? AND team_id = ? AND gameweek < ?
+                                   ORDER BY gameweek DESC LIMIT 1''',
+                                (league_id, SEASON, team_id, start)).fetchone()
+            if seed:
+                seeds[team_id] = seed
+        best_gameweek, best_points, worst_gameweek, worst_points = seeds.get(team_id, (None,) * 4)
+        recent = []
+        previous = None
+        for _, week, team_name, manager_name, points, total_points, rank, value, bank in team_rows:
+            recent = [(recent_week, recent_points) for recent_week, recent_points in recent
+                      if recent_week > week - FORM_GAMEWEEKS] + [(week, points)]
+            if week >= gameweek:
+                rank_change = previous[1] - rank if previous and previous[0] == week - 1 else None
+                # Like the awards, weeks without points don't count as a best or worst week
+                if points > 0 and (best_points is None or points > best_points):
+                    best_gameweek, best_points = week, points
+                if points > 0 and (worst_points is None or points < worst_points):
+                    worst_gameweek, worst_points = week, points
+                history.append((league_id, SEASON, team_id, week, team_name, manager_name, points,
+                                total_points, rank, rank_change, value, bank,
+                                sum(recent_points for _, recent_points in recent),
+                                best_gameweek, best_points, worst_gameweek, worst_points))
+            previous = (week, rank)
+
+    conn.executemany('INSERT OR REPLACE INTO team_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                     history)
+
+def update_team_award_counts(league_id=LEAGUE_ID):
+    """Recount each team's awards from award_winners; runs inside the caller's transaction."""
+    conn = get_db()
+    conn.execute('DELETE FROM team_award_counts WHERE league_id = ? AND season = ?',
+                 (league_id, SEASON))
+    conn.execute('''INSERT INTO team_award_counts
+                    SELECT league_id, season, team_id, award_type, COUNT(*)
+                    FROM award_winners
+                    WHERE league_id = ? AND season = ? AND team_id IS NOT NULL
+                    GROUP BY team_id, award_type''', (league_id, SEASON))
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def get_team_history(team_id, league_id=LEAGUE_ID):
+    """One manager's season from team_history with its precomputed aggregates, or None."""
+    c = get_db().cursor()
+    c.execute('''SELECT gameweek, team_name, manager_name, gw_points, total_points, rank,
+                        rank_change, team_value, bank_balance, form, best_gameweek, best_points,
+                        worst_gameweek, worst_points
+                 FROM team_history WHERE league_id = ? AND season = ? AND team_id = ?
+                 ORDER BY gameweek''', (league_id, SEASON, team_id))
+    rows = c.fetchall()
+    if not rows:
+        return None
+    c.execute('''SELECT award_type, wins FROM team_award_counts
+                 WHERE league_id = ? AND season = ? AND team_id = ?''', (league_id, SEASON, team_id))
+    wins = dict(c.fetchall())
+
+    latest = rows[-1]
+    return {
+        'team_id': team_id,
+        'team_name': latest[1],
+        'manager_name': latest[2],
+        'form': latest[9],
+        'form_gameweeks': FORM_GAMEWEEKS,
+        'best_week': {'gameweek': latest[10], 'points': latest[11]} if latest[10] is not None else None,
+        'worst_week': {'gameweek': latest[12], 'points': latest[13]} if latest[12] is not None else None,
+        'awards': {award_type: wins.get(award_type, 0) for award_type in AWARD_TYPES},
+        'history': [{
+            'gameweek': row[0],
+            'gw_points': row[3],
+            'total_points': row[4],
+            'rank': row[5],
+            'rank_change': row[6],
+            'team_value': row[7],
+            'bank_balance': row[8],
+            'form': row[9]
+        } for row in rows]
+    }
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def get_historical_data(gameweek, league_id=LEAGUE_ID):
     """Retrieve historical FPL data from the database."""
-    conn = sqlite3.connect('fpl_history.db')
-    c = conn.cursor()
+    c = get_db().cursor()
     
     # Get current gameweek data
-    c.execute('''SELECT * FROM fpl_data WHERE gameweek = ?''', (gameweek,))
-    current_data = []
-    for row in c.fetchall():
-        current_data.append({
-            'team_id': row[1],
-            'team_name': row[2],
-            'manager_name': row[3],
-            'gw_points': row[4],
-            'total_points': row[5],
-            'rank': row[6],
-            'team_value': row[7],
-            'bank_balance': row[8]
-        })
+    c.execute('''SELECT team_id, team_name, manager_name, gw_points, total_points,
+                        rank, team_value, bank_balance
+                 FROM fpl_data WHERE league_id = ? AND season = ? AND gameweek = ?''',
+              (league_id, SEASON, gameweek))
+    current_data = Standings(c)
     
     # Get previous gameweek data for comparison
     if gameweek > 1:
-        c.execute('''SELECT * FROM fpl_data WHERE gameweek = ?''', (gameweek - 1,))
-        previous_data = {row[1]: row[6] for row in c.fetchall()}  # team_id: rank
-        
-        # Add rank changes
-        for team in current_data:
-            if team['team_id'] in previous_data:
-                team['rank_change'] = previous_data[team['team_id']] - team['rank']
+        c.execute('''SELECT team_id, rank FROM fpl_data
+                     WHERE league_id = ? AND season = ? AND gameweek = ?''',
+                  (league_id, SEASON, gameweek - 1))
+        current_data.set_rank_changes(dict(c.fetchall()))  # team_id: rank
     
-    conn.close()
     return current_data
 
-# Function to fetch data from a given URL
-def fetch_data(url):
+def get_session():
+    """Return the shared keep-alive HTTP session used for upstream requests."""
+    global _session
+    if _session is None:
+        with _fetch_lock:
+            if _session is None:
+                import requests
+                import urllib3
+                from requests.adapters import HTTPAdapter
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+def get_fetch_pool():
+    """Return the shared thread pool that bounds upstream fan-out."""
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _fetch_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS,
+                                                 thread_name_prefix='fpl-fetch')
+    return _fetch_pool
+
+def acquire_request_slot():
+    """Block until the shared token bucket allows another upstream request."""
+    while True:
+        with _rate_limiter_lock:
+            now = time.monotonic()
+            limiter = _rate_limiter
+            if now >= limiter['paused_until']:
+                limiter['tokens'] = min(FETCH_WORKERS, limiter['tokens'] +
+                                        (now - limiter['updated']) * limiter['rate'])
+                limiter['updated'] = now
+                if limiter['tokens'] >= 1.0:
+                    limiter['tokens'] -= 1.0
+                    return
+                wait = (1.0 - limiter['tokens']) / limiter['rate']
+            else:
+                wait = limiter['paused_until'] - now
+        time.sleep(wait)
+
+def record_throttled(retry_after):
+    """Halve the request rate and pause everyone until ``retry_after`` seconds pass.
+
+    A burst of 429s from requests already in flight only halves the rate once.
+    The pause is capped at MAX_RETRY_DELAY, like the retry of the throttled request.
+    """
+    with _rate_limiter_lock:
+        now = time.monotonic()
+        if now >= _rate_limiter['paused_until']:
+            _rate_limiter['rate'] = max(MIN_RATE_LIMIT, _rate_limiter['rate'] / 2)
+        _rate_limiter['tokens'] = 0.0
+        _rate_limiter['paused_until'] = max(_rate_limiter['paused_until'],
+                                            now + min(retry_after, MAX_RETRY_DELAY))
+
+def record_success():
+    """Let the request rate recover additively towards RATE_LIMIT."""
+    with _rate_limiter_lock:
+        if _rate_limiter['rate'] < RATE_LIMIT:
+            _rate_limiter['rate'] = min(RATE_LIMIT, _rate_limiter['rate'] + RATE_LIMIT / 100)
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date), or None."""
+    if not value:
+        return None
     try:
-        response = requests.get(url, verify=False)  # Disable SSL verification
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error fetching data: {response.status_code}")
-            return None
-    except requests.exceptions.SSLError as e:
-        print(f"SSL error: {e}")
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
         return None
 
-def get_all_gameweek_data():
-    """Fetch data for all available gameweeks."""
-    all_data = {}
-    for gameweek in range(1, 39):  # 1-38
-        data = get_fpl_data(gameweek)
-        if data:
-            all_data[gameweek] = data
-    return all_data
+def retry_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt."""
+    return random.uniform(0, min(MAX_RETRY_DELAY, RETRY_BACKOFF * 2 ** attempt))
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def load_upstream_response(url):
+    """Return the cached raw response for ``url`` as (payload, etag, last_modified, fetched_at, immutable)."""
+    row = get_db().execute('''SELECT body, etag, last_modified, fetched_at, immutable
+                              FROM upstream_cache WHERE season = ? AND url = ?''',
+                           (SEASON, url)).fetchone()
+    if row is None:
+        return None
+    return (json.loads(zlib.decompress(row[0])),) + tuple(row[1:])
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def store_upstream_response(url, body, etag, last_modified, immutable):
+    """Cache a raw upstream response body compressed, with its validators."""
+    conn = get_db()
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO upstream_cache VALUES (?, ?, ?, ?, ?, ?, ?)',
+                     (SEASON, url, zlib.compress(body), etag, last_modified, time.time(),
+                      int(immutable)))
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def touch_upstream_response(url):
+    """Mark a cached response as just revalidated."""
+    conn = get_db()
+    with conn:
+        conn.execute('UPDATE upstream_cache SET fetched_at = ? WHERE season = ? AND url = ?',
+                     (time.time(), SEASON, url))
+
+# Returned by fetch_data(..., not_found=NOT_FOUND) when the API answers 404
+NOT_FOUND = object()
+
+def fetch_data(url, max_age=0, immutable=False, not_found=None):
+    """GET a JSON document from the FPL API, or None if it can't be fetched.
+
+    Responses that carry an ETag or Last-Modified are kept compressed in the
+    upstream_cache table and revalidated with a conditional request, so an
+    unchanged resource costs a 304 instead of a full download. Cached copies
+    younger than ``max_age`` seconds are used without asking, and ``immutable``
+    ones (e.g. picks for a finished gameweek) are never fetched again.
+
+    Requests share a token-bucket limiter that slows down when the API answers
+    429. Throttling, server errors, timeouts and connection failures are retried
+    up to MAX_RETRIES times with jittered backoff (honouring Retry-After);
+    other non-200 responses such as 404 are returned as None straight away.
+    Callers for whom a missing resource is an answer rather than a failure can
+    pass ``not_found`` (e.g. NOT_FOUND) to get it back for a 404 instead.
+    """
+    import requests
+    endpoint = upstream_endpoint(url)
+    cached = load_upstream_response(url)
+    headers = {}
+    if cached:
+        payload, etag, last_modified, fetched_at, cached_immutable = cached
+        if cached_immutable or time.time() - fetched_at < max_age:
+            inc_counter('fpl_cache_requests_total', (('cache', 'upstream'), ('result', 'hit')))
+            return payload
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+    for attempt in range(MAX_RETRIES + 1):
+        acquire_request_slot()
+        start = time.perf_counter()
+        try:
+            response = get_session().get(url, headers=headers, verify=False,  # Disable SSL verification
+                                         timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            observe('fpl_upstream_request_duration_seconds', time.perf_counter() - start,
+                    (('endpoint', endpoint),))
+            inc_counter('fpl_upstream_requests_total', (('endpoint', endpoint), ('status', 'error')))
+            error = f"{type(e).__name__}: {e}"
+            delay = retry_delay(attempt)
+        else:
+            observe('fpl_upstream_request_duration_seconds', time.perf_counter() - start,
+                    (('endpoint', endpoint),))
+            inc_counter('fpl_upstream_requests_total',
+                        (('endpoint', endpoint), ('status', str(response.status_code))))
+            if response.status_code == 304 and cached:
+                inc_counter('fpl_cache_requests_total', (('cache', 'upstream'), ('result', 'revalidated')))
+                record_success()
+                touch_upstream_response(url)
+                return cached[0]
+            if response.status_code == 200:
+                inc_counter('fpl_cache_requests_total', (('cache', 'upstream'), ('result', 'miss')))
+                record_success()
+                try:
+                    payload = response.json()
+                except ValueError:
+                    logger.warning(f"Invalid JSON from {url}")
+                    return None
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified or immutable or max_age:
+                    store_upstream_response(url, response.content, etag, last_modified, immutable)
+                return payload
+            if response.status_code == 404 and not_found is not None:
+                logger.debug(f"Not found: {url}")
+                return not_found
+            if response.status_code not in RETRY_STATUSES:
+                logger.warning(f"Error fetching {url}: {response.status_code}")
+                return None
+            error = f"HTTP {response.status_code}"
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code == 429:
+                record_throttled(retry_after if retry_after is not None else retry_delay(attempt))
+            delay = min(MAX_RETRY_DELAY, retry_after) if retry_after is not None else retry_delay(attempt)
+
+        if attempt < MAX_RETRIES:
+            time.sleep(delay)
+    logger.warning(f"Giving up on {url} after {MAX_RETRIES + 1} attempts: {error}")
+    return None
+
+def season_needs_backfill(gameweeks, league_id=LEAGUE_ID):
+    """Check whether stored gameweeks have gaps worth one season backfill."""
+    # Fill gaps in the season with one history call per manager instead of
+    # a standings + picks fan-out for every missing gameweek
+    return (league_id not in _backfilled_leagues
+            and (not gameweeks or len(gameweeks) < gameweeks[-1]))
+
+SEASON_COLUMNS = ['gameweek', 'team_id', 'team_name', 'manager_name', 'gw_points',
+                  'total_points', 'rank', 'team_value', 'bank_balance',
+                  'rank_change', 'points_delta']
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def fetch_season_rows(league_id=LEAGUE_ID):
+    """Read every stored row of the season in one ordered scan (see SEASON_COLUMNS).
+
+    Rank changes and week-over-week point deltas come from LAG over each
+    team's rows, so no gameweek is queried twice.
+    """
+    return season_rows_cursor(league_id).fetchall()
+
+def season_rows_cursor(league_id=LEAGUE_ID):
+    """Return a cursor over the fetch_season_rows scan, for reading it row by row."""
+    c = get_db().cursor()
+    c.execute('''SELECT gameweek, team_id, team_name, manager_name, gw_points,
+                        total_points, rank, team_value, bank_balance,
+                        CASE WHEN LAG(gameweek) OVER w = gameweek - 1
+                             THEN LAG(rank) OVER w - rank END AS rank_change,
+                        CASE WHEN LAG(gameweek) OVER w = gameweek - 1
+                             THEN gw_points - LAG(gw_points) OVER w END AS points_delta
+                 FROM fpl_data
+                 WHERE league_id = ? AND season = ?
+                 WINDOW w AS (PARTITION BY team_id ORDER BY gameweek)
+                 ORDER BY gameweek, team_id''', (league_id, SEASON))
+    return c
+
+def find_award_winners(frame):
+    """Find every gameweek's award winners in one columnar pass.
+
+    ``frame`` holds one row per team per gameweek with at least gameweek,
+    team_id, team_name, manager_name and gw_points; a points_delta column
+    against the previous gameweek is derived if missing. Returns a long frame
+    of (gameweek, award_type, team_id, team_name, manager_name, points) that
+    keeps the input row order within each award, with the same rules as
+    calculate_awards and calculate_gameweek_champion.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = ['gameweek', 'award_type', 'team_id', 'team_name', 'manager_name', 'points']
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Work on the numeric columns only; names are looked up for the winners at the end
+    gameweeks = frame['gameweek'].to_numpy()
+    points = frame['gw_points'].to_numpy()
+    if 'points_delta' in frame:
+        deltas = frame['points_delta'].to_numpy(dtype='float64', na_value=np.nan)
+    else:
+        team_ids = frame['team_id'].to_numpy()
+        order = np.lexsort((gameweeks, team_ids))
+        consecutive = ((team_ids[order][1:] == team_ids[order][:-1])
+                       & (gameweeks[order][1:] == gameweeks[order][:-1] + 1))
+        deltas = np.full(len(frame), np.nan)
+        deltas[order[1:][consecutive]] = (points[order][1:] - points[order][:-1])[consecutive]
+
+    # Teams on 0 points didn't play and can't win anything
+    scored = np.flatnonzero(points > 0)
+    scored_points = pd.Series(points[scored])
+    by_gameweek = scored_points.groupby(gameweeks[scored])
+    weekly = scored[(scored_points == by_gameweek.transform('max')).to_numpy()]
+    spoons = scored[(scored_points == by_gameweek.transform('min')).to_numpy()]
+
+    # Best improvement on the previous gameweek, whether or not anyone improved
+    improved = scored[~np.isnan(deltas[scored])]
+    improved_deltas = pd.Series(deltas[improved])
+    best = improved_deltas.groupby(gameweeks[improved]).transform('max')
+    champions = improved[(improved_deltas == best).to_numpy()]
+
+    rows = np.concatenate([weekly, spoons, champions])
+    winners = frame.iloc[rows][['gameweek', 'team_id', 'team_name', 'manager_name']].reset_index(drop=True)
+    winners['award_type'] = (['weekly_champion'] * len(weekly) + ['wooden_spoon'] * len(spoons)
+                             + ['gameweek_champion'] * len(champions))
+    winners['points'] = np.concatenate([points[weekly], points[spoons],
+                                        deltas[champions]]).astype('int64')
+    return winners[columns]
+
+def summarize_award_winners(winners):
+    """Season totals per manager: award counts and longest consecutive-gameweek runs."""
+    if winners.empty:
+        return []
+    award_types = list(AWARD_TYPES)
+
+    counts = (winners.groupby(['team_id', 'award_type']).size()
+              .unstack(fill_value=0).reindex(columns=award_types, fill_value=0))
+
+    # Consecutive gameweeks share the same gameweek - position offset within a run
+    wins = (winners.drop_duplicates(['team_id', 'award_type', 'gameweek'])
+            .sort_values(['team_id', 'award_type', 'gameweek']))
+    run = wins['gameweek'] - wins.groupby(['team_id', 'award_type']).cumcount()
+    streaks = (wins.groupby(['team_id', 'award_type', run]).size()
+               .groupby(level=[0, 1]).max()
+               .unstack(fill_value=0).reindex(columns=award_types, fill_value=0))
+
+    names = winners.drop_duplicates('team_id', keep='last').set_index('team_id').reindex(counts.index)
+    count_columns = [counts[award_type].tolist() for award_type in award_types]
+    streak_columns = [streaks.reindex(counts.index)[award_type].tolist() for award_type in award_types]
+    summary = [{
+        'team_id': team_id,
+        'team_name': team_name,
+        'manager_name': manager_name,
+        'awards': dict(zip(award_types, team_counts)),
+        'longest_streaks': dict(zip(award_types, team_streaks))
+    } for team_id, team_name, manager_name, team_counts, team_streaks in zip(
+        counts.index.tolist(), names['team_name'].tolist(), names['manager_name'].tolist(),
+        zip(*count_columns), zip(*streak_columns))]
+    summary.sort(key=lambda team: (-team['awards']['weekly_champion'], team['team_name']))
+    return summary
+
+def get_season_award_summary(league_id=LEAGUE_ID):
+    """Award counts and streaks per manager for the stored season."""
+    import pandas as pd
+    frame = pd.DataFrame.from_records(fetch_season_rows(league_id), columns=SEASON_COLUMNS)
+    return summarize_award_winners(find_award_winners(frame))
+
+@timed('fpl_db_query_duration_seconds', 'helper')
+def get_scored_gameweeks(league_id=LEAGUE_ID):
+    """Return the stored gameweeks where somebody has scored, in order."""
+    return [row[0] for row in get_db().execute(
+        '''SELECT gameweek FROM fpl_data WHERE league_id = ? AND season = ?
+           GROUP BY gameweek HAVING MAX(gw_points) > 0 ORDER BY gameweek''',
+        (league_id, SEASON))]
+
+def iter_season_data(league_id=LEAGUE_ID):
+    """Yield (gameweek, payload) for every stored gameweek from one cursor.
+
+    Reads the fetch_season_rows scan row by row and groups it one gameweek at
+    a time. Rank changes and the deltas behind the gameweek champion come with
+    each row from LAG, so no earlier gameweek is kept. Gameweeks where nobody
+    has scored yet are left out, as get_fpl_data would not serve them from the DB.
+    """
+    for gameweek, rows in itertools.groupby(season_rows_cursor(league_id), key=lambda row: row[0]):
+        current_data, deltas = Standings(), []
+        for row in rows:
+            current_data.append(*row[1:9])
+            if row[9] is not None:
+                current_data.rank_change[-1] = row[9]
+            deltas.append(row[10])
+
+        if current_data.has_points():
+            awards = calculate_awards(current_data)
+            awards['gameweek_champion'] = calculate_gameweek_champion(gameweek, current_data,
+                                                                      None, deltas)
+            yield gameweek, {'standings': current_data, 'awards': awards}
+
+def invalidate_response_cache(gameweek, league_id=LEAGUE_ID):
+    """Drop cached responses affected by a write to ``gameweek``.
+
+    The next gameweek depends on this one for rank changes and the gameweek
+    champion, so it is dropped too, along with the full-season response.
+    """
+    global _response_cache_generation
+    with _response_cache_lock:
+        _response_cache_generation += 1
+        _response_cache.pop((league_id, gameweek), None)
+        _response_cache.pop((league_id, gameweek + 1), None)
+        _response_cache.pop((league_id, gameweek, 'changed-at'), None)
+        _response_cache.pop((league_id, gameweek + 1, 'changed-at'), None)
+        _response_cache.pop((league_id, 'all'), None)
+        _response_cache.pop((league_id, 'award-summary'), None)
+        for award_type in AWARD_TYPES:
+            _response_cache.pop((league_id, 'awards-history', award_type), None)
+
+def _store_response(key, body, generation):
+    """Cache ``body`` unless a write invalidated the cache since ``generation``."""
+    with _response_cache_lock:
+        if generation == _response_cache_generation:
+            _response_cache[key] = body
+
+def _cached_response(key, build):
+    """Return cached JSON bytes for ``key``, building and storing them on a miss.
+
+    A result is only stored if no write invalidated the cache while it was built.
+    """
+    body = _response_cache.get(key)
+    if body is not None:
+        inc_counter('fpl_cache_requests_total', (('cache', 'response'), ('result', 'hit')))
+        return body
+
+    inc_counter('fpl_cache_requests_total', (('cache', 'response'), ('result', 'miss')))
+    generation = _response_cache_generation
+    body = build()
+    if body is not None:
+        _store_response(key, body, generation)
+    return body
+
+def single_flight(kind, league_ids, compute):
+    """Run ``compute`` at most once at a time for each league under ``kind``.
+
+    Leagues another thread is already computing are waited for and share its
+    result; ``compute`` is called with the remaining league ids and returns
+    ``{league_id: result}``. Returns the results for every requested league.
+    """
+    owned, waiting = {}, {}
+    with _inflight_lock:
+        for league_id in league_ids:
+            key = kind + (league_id,)
+            if key in _inflight:
+                waiting[league_id] = _inflight[key]
+            else:
+                owned[league_id] = _inflight[key] = Future()
+    if waiting:
+        inc_counter('fpl_cache_requests_total', (('cache', 'inflight'), ('result', 'hit')), len(waiting))
+    if owned:
+        inc_counter('fpl_cache_requests_total', (('cache', 'inflight'), ('result', 'miss')), len(owned))
+
+    results = {}
+    try:
+        if owned:
+            results.update(compute(list(owned)))
+    except BaseException as e:
+        for future in owned.values():
+            future.set_exception(e)
+        raise
+    else:
+        for league_id, future in owned.items():
+            future.set_result(results.get(league_id))
+    finally:
+        with _inflight_lock:
+            for league_id in owned:
+                _inflight.pop(kind + (league_id,), None)
+
+    for league_id, future in waiting.items():
+        results[league_id] = future.result()
+    return {league_id: results.get(league_id) for league_id in league_ids}
+
+def is_in_flight(kind, league_id):
+    with _inflight_lock:
+        return kind + (league_id,) in _inflight
+
+def get_data_version():
+    """Return a token that changes whenever stored FPL data is written."""
+    return f'{_data_version_prefix}-{_response_cache_generation}'
+
+def get_compressed_response(key, version, body):
+    """Gzip an API body once per data version and reuse it until the data changes."""
+    compressed = _compressed_responses.get((key, version))
+    inc_counter('fpl_cache_requests_total',
+                (('cache', 'gzip'), ('result', 'miss' if compressed is None else 'hit')))
+    if compressed is None:
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+        with _response_cache_lock:
+            if any(cached_version != version for _, cached_version in _compressed_responses):
+                _compressed_responses.clear()
+            _compressed_responses[(key, version)] = compressed
+    return compressed
+
+def get_gameweek_json(gameweek, league_id=LEAGUE_ID):
+    """Return the serialized /api/data response for a gameweek, or None."""
+    def build():
+        data = get_fpl_data(gameweek, league_id)
+        return json.dumps(data, default=json_default).encode() if data else None
+    return _cached_response((league_id, gameweek), build)
+
+def iter_all_gameweek_json(league_id=LEAGUE_ID):
+    """Return the /api/all-data response as bytes if cached, else as an iterator of chunks.
+
+    The iterator encodes one gameweek at a time straight off the season cursor,
+    so memory stays flat however large the league is. Gameweeks seed the
+    per-gameweek cache and the whole body is cached only while the body so far
+    stays under STREAM_CACHE_LIMIT bytes.
+    """
+    key = (league_id, 'all')
+    body = _response_cache.get(key)
+    if body is not None:
+        inc_counter('fpl_cache_requests_total', (('cache', 'response'), ('result', 'hit')))
+        return body
+    inc_counter('fpl_cache_requests_total', (('cache', 'response'), ('result', 'miss')))
+
+    # While the season still has gaps, what is stored is served but not cached
+    # whole, so a later retry of the backfill isn't hidden behind a cache hit
+    complete = not backfill_missing_gameweeks([league_id])
+
+    def chunks():
+        generation = _response_cache_generation
+        kept, size = [], 0
+        for gameweek, data in iter_season_data(league_id):
+            body = _response_cache.get((league_id, gameweek))
+            if body is None:
+                body = json.dumps(data, default=json_default).encode()
+                if size + len(body) <= STREAM_CACHE_LIMIT:
+                    _store_response((league_id, gameweek), body, generation)
+            chunk = b'%s"%d": %s' % (b', ' if size else b'{', gameweek, body)
+            size += len(chunk)
+            if kept is not None and size <= STREAM_CACHE_LIMIT:
+                kept.append(chunk)
+            else:
+                kept = None
+            yield chunk
+        chunk = b'}' if size else b'{}'
+        yield chunk
+        if kept is not None and complete:
+            _store_response(key, b''.join(kept + [chunk]), generation)
+    return chunks()
 
 def calculate_awards(data):
     """Calculate all awards for a given gameweek's data."""
@@ -201,7 +1368,8 @@ def calculate_awards(data):
         }
 
     # Filter out teams with 0 points
-    valid_teams = [team for team in data if team['gw_points'] > 0]
+    points = data.gw_points
+    valid_teams = [index for index, team_points in enumerate(points) if team_points > 0]
     
     if not valid_teams:
         return {
@@ -211,43 +1379,50 @@ def calculate_awards(data):
         }
 
     # Find weekly champion (most points)
-    max_points = max(team['gw_points'] for team in valid_teams)
-    weekly_champions = [team for team in valid_teams if team['gw_points'] == max_points]
+    max_points = max(points[index] for index in valid_teams)
+    weekly_champions = [index for index in valid_teams if points[index] == max_points]
     
     # Find wooden spoon (least points)
-    min_points = min(team['gw_points'] for team in valid_teams)
-    wooden_spoons = [team for team in valid_teams if team['gw_points'] == min_points]
+    min_points = min(points[index] for index in valid_teams)
+    wooden_spoons = [index for index in valid_teams if points[index] == min_points]
     
     return {
         'weekly_champion': [{
-            'team_name': champ['team_name'],
-            'manager_name': champ['manager_name'],
-            'points': champ['gw_points']
+            'team_name': data.team_name[champ],
+            'manager_name': data.manager_name[champ],
+            'points': points[champ]
         } for champ in weekly_champions],
         'wooden_spoon': [{
-            'team_name': spoon['team_name'],
-            'manager_name': spoon['manager_name'],
-            'points': spoon['gw_points']
+            'team_name': data.team_name[spoon],
+            'manager_name': data.manager_name[spoon],
+            'points': points[spoon]
         } for spoon in wooden_spoons]
     }
 
-def calculate_gameweek_champion(gameweek, current_data, previous_data):
-    """Calculate the gameweek champion based on points improvement."""
-    if not previous_data:
+def calculate_gameweek_champion(gameweek, current_data, previous_data, deltas=None):
+    """Calculate the gameweek champion based on points improvement.
+
+    ``deltas`` can give each team's points change on the previous gameweek
+    directly (None for teams without one), as the LAG in fetch_season_rows
+    does, in place of ``previous_data``.
+    """
+    if deltas is None and not previous_data:
         return []
     
     # Filter out teams with 0 points in current gameweek
-    valid_current_teams = [team for team in current_data if team['gw_points'] > 0]
+    points = current_data.gw_points
+    valid_current_teams = [index for index, team_points in enumerate(points) if team_points > 0]
     if not valid_current_teams:
         return []
     
-    improvements = []
-    for current_team in valid_current_teams:
-        for previous_team in previous_data:
-            if current_team['team_id'] == previous_team['team_id']:
-                improvement = current_team['gw_points'] - previous_team['gw_points']
-                improvements.append((current_team, improvement))
-                break
+    if deltas is None:
+        previous_points = {}
+        for team_id, team_points in zip(previous_data.team_id, previous_data.gw_points):
+            previous_points.setdefault(team_id, team_points)
+        deltas = [points[index] - previous_points[team_id] if team_id in previous_points else None
+                  for index, team_id in enumerate(current_data.team_id)]
+    improvements = [(index, deltas[index]) for index in valid_current_teams
+                    if deltas[index] is not None]
 
     if not improvements:
         return []
@@ -263,24 +1438,24 @@ def calculate_gameweek_champion(gameweek, current_data, previous_data):
         champions = [imp for imp in improvements if imp[1] == max_improvement]
 
     return [{
-        'team_name': champ[0]['team_name'],
-        'manager_name': champ[0]['manager_name'],
+        'team_name': current_data.team_name[champ[0]],
+        'manager_name': current_data.manager_name[champ[0]],
         'points': champ[1]  # This is the difference
     } for champ in champions]
 
 def save_data_to_json(data, filename):
     """Save data to a JSON file."""
     with open(filename, 'w') as f:
-        json.dump(data, f)
+        json.dump(data, f, default=json_default)
 
-def load_data_from_json(filename):
-    """Load data from a JSON file if it exists and is not too old."""
+def load_data_from_json(filename, max_age=timedelta(hours=1)):
+    """Load data from a JSON file if it exists and is not older than ``max_age`` (None: any age)."""
     if not os.path.exists(filename):
         return None
     
-    # Check if file is older than 1 hour
+    # An older file than max_age is treated as missing
     file_time = datetime.fromtimestamp(os.path.getmtime(filename))
-    if datetime.now() - file_time > timedelta(hours=1):
+    if max_age is not None and datetime.now() - file_time > max_age:
         return None
     
     try:
@@ -289,13 +1464,379 @@ def load_data_from_json(filename):
     except:
         return None
 
-def get_fpl_data(gameweek):
-    """Fetch and process FPL data for a specific gameweek."""
+def fetch_league_standings(league_id, on_page=None):
+    """Fetch every page of a classic league's standings.
+
+    ``on_page`` is called with each page's entries as soon as it arrives, so
+    per-entry fetches can start before the last page has been read. Returns
+    None if any page fails, since a partial league would skew ranks and awards.
+    """
+    standings = []
+    page = 1
+    while True:
+        league_url = (f"{FPL_API_BASE}/leagues-classic/{league_id}"
+                      f"/standings/?page_standings={page}")
+        league_data = fetch_data(league_url)
+        if not league_data:
+            logger.warning(f"Could not fetch page {page} of league {league_id} standings")
+            return None
+
+        results = league_data['standings']['results']
+        standings.extend(results)
+        if on_page:
+            on_page(results)
+        if not league_data['standings'].get('has_next'):
+            return standings
+        page += 1
+
+def fetch_league_entries(league_ids, fetch_entry):
+    """Read the standings of several leagues and fetch each distinct entry once.
+
+    Returns ``(standings_by_league, futures_by_team_id)``; a league whose
+    standings could not be read maps to None. Managers who appear in more
+    than one league share a single ``fetch_entry(team_id)`` call.
+    """
+    pool = get_fetch_pool()
+    futures = {}
+
+    def submit(results):
+        for team in results:
+            if team['entry'] not in futures:
+                futures[team['entry']] = pool.submit(fetch_entry, team['entry'])
+
+    leagues = {league_id: fetch_league_standings(league_id, on_page=submit)
+               for league_id in league_ids}
+    return leagues, futures
+
+def fetch_entry_gameweek(team_id, gameweek):
+    """Fetch one entry's gameweek stats, falling back to the entry endpoint.
+
+    Returns None when neither endpoint answers, so an upstream failure is never
+    mistaken for a manager who scored nothing. A 404 for the picks is an answer:
+    the manager had no team that gameweek (e.g. they joined later) and scored 0.
+    """
+    # Fetch gameweek points and other info
+    gw_url = f"{FPL_API_BASE}/entry/{team_id}/event/{gameweek}/picks/"
+    gw_data = fetch_data(gw_url, immutable=gameweek_is_final(gameweek), not_found=NOT_FOUND)
+
+    if gw_data is NOT_FOUND:
+        return {'gw_points': 0, 'total_points': 0, 'team_value': 0.0, 'bank_balance': 0.0}
+    if gw_data and 'entry_history' in gw_data:
+        history = gw_data['entry_history']
+    else:
+        # Try to get data from the current gameweek endpoint
+        current_url = f"{FPL_API_BASE}/entry/{team_id}/"
+        entry_data = fetch_data(current_url)
+        if entry_data and isinstance(entry_data.get('current_event'), dict):
+            history = entry_data['current_event']
+        elif (entry_data and entry_data.get('current_event') == gameweek
+              and 'summary_event_points' in entry_data):
+            # The live API reports current_event as an id with summary fields alongside,
+            # which only describe that gameweek
+            history = {
+                'points': entry_data['summary_event_points'],
+                'total_points': entry_data['summary_overall_points'],
+                'value': entry_data['last_deadline_value'],
+                'bank': entry_data['last_deadline_bank']
+            }
+        else:
+            return None
+
+    return {
+        'gw_points': history['points'],
+        'total_points': history['total_points'],
+        'team_value': history['value'] / 10,
+        'bank_balance': history['bank'] / 10
+    }
+
+def build_team_row(team, stats):
+    """Combine a league standings entry with its fetched gameweek stats as a Standings record."""
+    return (team['entry'], team['entry_name'], team['player_name'], stats['gw_points'],
+            stats['total_points'], team['rank'], stats['team_value'], stats['bank_balance'])
+
+def gameweek_cache_file(gameweek, league_id=LEAGUE_ID):
+    """Path of the JSON cache for one league's gameweek."""
+    return f'cache/league_{league_id}_gameweek_{gameweek}.json'
+
+def store_league_gameweek(gameweek, current_data, league_id=LEAGUE_ID):
+    """Store freshly fetched standings with their awards and return the API payload."""
+    # Only store data if we have valid points
+    if not current_data.has_points():
+        return None
+
+    # Get previous gameweek data for comparison
+    previous_data = get_historical_data(gameweek - 1, league_id) if gameweek > 1 else None
+    if previous_data:
+        current_data.set_rank_changes(dict(zip(previous_data.team_id, previous_data.rank)))
+
+    # Calculate all awards
+    awards = calculate_awards(current_data)
+    awards['gameweek_champion'] = calculate_gameweek_champion(gameweek, current_data, previous_data)
+
+    result_data = {
+        'standings': current_data,
+        'awards': awards
+    }
+    # Standings and award winners are written together
+    if not store_fpl_data(gameweek, current_data, league_id, awards['gameweek_champion']):
+        # The stored awards, cached payload and stream snapshot are already current
+        logger.debug(f"League {league_id} gameweek {gameweek} unchanged")
+        return result_data
+
+    # Cache the result
+    os.makedirs('cache', exist_ok=True)
+    save_data_to_json(result_data, gameweek_cache_file(gameweek, league_id))
+
+    publish_standings_update(gameweek, league_id, result_data)
+    return result_data
+
+def ingest_gameweek(gameweek, league_ids=None):
+    """Fetch and store one gameweek for several leagues from the FPL API.
+
+    Standings pages are streamed into the fetch pool as they arrive and each
+    manager is fetched once, however many of the leagues they play in.
+    Returns the stored payload per league, or None where nothing was stored;
+    a league is left untouched if any of its managers could not be fetched.
+    A league that is already being stored by another thread is not fetched
+    again; its result is shared.
+    """
+    league_ids = league_ids or LEAGUE_IDS
+    return single_flight(('store', gameweek), league_ids,
+                         lambda owned: _ingest_gameweek(gameweek, owned))
+
+def _ingest_gameweek(gameweek, league_ids):
+    leagues, futures = fetch_league_entries(
+        league_ids, lambda team_id: fetch_entry_gameweek(team_id, gameweek))
+
+    results = {}
+    for league_id, standings in leagues.items():
+        if standings is None:
+            results[league_id] = None
+            continue
+        failed = [team['entry'] for team in standings if futures[team['entry']].result() is None]
+        if failed:
+            logger.warning(f"Skipping league {league_id} gameweek {gameweek}: "
+                  f"could not fetch {len(failed)} managers")
+            results[league_id] = None
+            continue
+        current_data = Standings(build_team_row(team, futures[team['entry']].result())
+                                 for team in standings)
+        results[league_id] = store_league_gameweek(gameweek, current_data, league_id)
+    return results
+
+# Minimum number of outfield starters per position type (DEF, MID, FWD) after
+# auto-subs; the line-up must also keep exactly one goalkeeper (type 1)
+FORMATION_MINIMUMS = {2: 3, 3: 2, 4: 1}
+
+def fetch_entry_picks(team_id, gameweek):
+    """Fetch an entry's picks for a gameweek as a compact record, or None."""
+    data = fetch_data(f"{FPL_API_BASE}/entry/{team_id}/event/{gameweek}/picks/",
+                      immutable=gameweek_is_final(gameweek))
+    if not data or 'picks' not in data or 'entry_history' not in data:
+        return None
+    picks = sorted(data['picks'], key=lambda pick: pick['position'])
+    history = data['entry_history']
+    return {
+        'elements': [pick['element'] for pick in picks],
+        'multipliers': [pick['multiplier'] for pick in picks],
+        'captain': next((i for i, pick in enumerate(picks) if pick['is_captain']), None),
+        'vice_captain': next((i for i, pick in enumerate(picks) if pick['is_vice_captain']), None),
+        'chip': data.get('active_chip'),
+        # Season total before this gameweek's points (transfer hits already applied)
+        'base_total': history['total_points'] - history['points'],
+        'team_value': history['value'] / 10,
+        'bank_balance': history['bank'] / 10
+    }
+
+def apply_auto_subs(picks, played, finished):
+    """Return the pick multipliers after the auto-subs that can already be decided.
+
+    ``played`` and ``finished`` map player id to whether they have minutes and
+    whether their club is done for the gameweek. A starter is only replaced
+    once they certainly blanked, and a bench player is only brought on once
+    they have played. Bench order and formation minimums are respected, as is
+    the vice-captain taking over a captain who didn't play.
+    """
+    elements = picks['elements']
+    multipliers = list(picks['multipliers'])
+    element_info = _events_cache['elements'] or {}
+    types = [element_info.get(element, (0, None))[0] for element in elements]
+
+    def blanked(i):
+        return not played.get(elements[i], False) and finished.get(elements[i], False)
+
+    # Bench boost already plays the whole squad, so only the captaincy can move
+    lineup = list(range(len(elements) if picks['chip'] == 'bboost' else 11))
+    bench = [] if picks['chip'] == 'bboost' else list(range(11, len(elements)))
+    for slot, starter in enumerate(list(lineup)):
+        if not blanked(starter):
+            continue
+        for sub in list(bench):
+            candidate = [sub if i == starter else i for i in lineup]
+            counts = {}
+            for i in candidate:
+                counts[types[i]] = counts.get(types[i], 0) + 1
+            if not (counts.get(1, 0) == 1 and all(counts.get(position, 0) >= minimum
+                                                  for position, minimum in FORMATION_MINIMUMS.items())):
+                continue  # e.g. the bench goalkeeper for an outfield starter
+            if not played.get(elements[sub], False):
+                if blanked(sub):
+                    continue
+                break  # The next bench player could still come on; wait for them
+            lineup[slot] = sub
+            bench.remove(sub)
+            multipliers[sub] = 1
+            multipliers[starter] = 0
+            break
+
+    captain, vice = picks['captain'], picks['vice_captain']
+    if (captain is not None and vice is not None and blanked(captain)
+            and vice in lineup and not blanked(vice)):
+        multipliers[vice] = picks['multipliers'][captain]
+        multipliers[captain] = 0
+    return multipliers
+
+def compute_live_points(picks_by_team, live_elements, fixtures):
+    """Score every team from the event live feed as one matrix operation.
+
+    Builds a managers x picks matrix of player ids, gathers each player's live
+    points through it and sums the rows weighted by the pick multipliers.
+    Returns ``{team_id: gameweek_points}``.
+    """
+    import numpy as np
+
+    if not picks_by_team:
+        return {}
+
+    max_element = max(max(element['id'] for element in live_elements or [{'id': 0}]),
+                      max(max(picks['elements']) for picks in picks_by_team.values()))
+    points = np.zeros(max_element + 1, dtype=np.int32)
+    for element in live_elements or []:
+        points[element['id']] = element['stats']['total_points']
+    played = {element['id']: element['stats']['minutes'] > 0 for element in live_elements or []}
+
+    # A club is done once all of its fixtures are over; clubs without a fixture are done too.
+    # Without the fixture list nobody is known to be done, so no auto-subs are decided.
+    finished = {}
+    if fixtures is not None:
+        club_open = set()
+        for fixture in fixtures:
+            if not (fixture.get('finished') or fixture.get('finished_provisional')):
+                club_open.update((fixture['team_h'], fixture['team_a']))
+        element_info = _events_cache['elements'] or {}
+        finished = {element: info[1] not in club_open for element, info in element_info.items()}
+
+    team_ids = list(picks_by_team)
+    width = max(len(picks['elements']) for picks in picks_by_team.values())
+    elements = np.zeros((len(team_ids), width), dtype=np.int32)
+    multipliers = np.zeros((len(team_ids), width), dtype=np.int32)
+    for row, team_id in enumerate(team_ids):
+        picks = picks_by_team[team_id]
+        count = len(picks['elements'])
+        elements[row, :count] = picks['elements']
+        if any(not played.get(element, False) and finished.get(element, False)
+               for element in picks['elements']):
+            multipliers[row, :count] = apply_auto_subs(picks, played, finished)
+        else:
+            multipliers[row, :count] = picks['multipliers']
+
+    totals = (points[elements] * multipliers).sum(axis=1)
+    return dict(zip(team_ids, totals.tolist()))
+
+def get_live_picks(gameweek, league_ids):
+    """Return cached league membership and picks for a live gameweek.
+
+    Standings and picks are fetched the first time a gameweek is scored and
+    reused on every later tick; only entries that failed are retried.
+    """
+    with _live_picks_lock:
+        if _live_picks['gameweek'] != gameweek:
+            _live_picks.update({'gameweek': gameweek, 'picks': {}, 'leagues': {}})
+        cached_picks = _live_picks['picks']
+        missing_leagues = [league_id for league_id in league_ids
+                           if _live_picks['leagues'].get(league_id) is None]
+
+        def fetch_picks(team_id):
+            if team_id in cached_picks:
+                return cached_picks[team_id]
+            return fetch_entry_picks(team_id, gameweek)
+
+        leagues, futures = fetch_league_entries(missing_leagues, fetch_picks)
+        _live_picks['leagues'].update(leagues)
+
+        # Retry entries from already-known leagues whose picks failed last time
+        pool = get_fetch_pool()
+        for league_id in league_ids:
+            for team in _live_picks['leagues'].get(league_id) or []:
+                if team['entry'] not in cached_picks and team['entry'] not in futures:
+                    futures[team['entry']] = pool.submit(fetch_entry_picks, team['entry'], gameweek)
+        for team_id, future in futures.items():
+            picks = future.result()
+            if picks is not None:
+                cached_picks[team_id] = picks
+
+        return {league_id: _live_picks['leagues'].get(league_id) for league_id in league_ids}, cached_picks
+
+def ingest_live_gameweek(gameweek, league_ids=None):
+    """Score an in-progress gameweek from the live feed and cached picks.
+
+    After the first tick of a gameweek this costs one event/live request (plus
+    the fixtures the scheduler already fetched) however large the leagues are.
+    Returns the stored payload per league, or None where nothing was stored.
+    Like ingest_gameweek, concurrent stores of a league are coalesced.
+    """
+    league_ids = league_ids or LEAGUE_IDS
+    return single_flight(('store', gameweek), league_ids,
+                         lambda owned: _ingest_live_gameweek(gameweek, owned))
+
+def _ingest_live_gameweek(gameweek, league_ids):
+    live = fetch_data(f"{FPL_API_BASE}/event/{gameweek}/live/")
+    if not live or 'elements' not in live:
+        logger.warning(f"Live data unavailable for gameweek {gameweek}")
+        return {league_id: None for league_id in league_ids}
+
+    get_events()  # Make sure player positions and clubs are loaded
+    leagues, picks = get_live_picks(gameweek, league_ids)
+    live_points = compute_live_points(picks, live['elements'], get_fixtures(gameweek))
+
+    results = {}
+    for league_id, standings in leagues.items():
+        if standings is None or any(team['entry'] not in picks for team in standings):
+            results[league_id] = None
+            continue
+        current_data = Standings()
+        for team in standings:
+            team_picks = picks[team['entry']]
+            gw_points = live_points[team['entry']]
+            current_data.append(team['entry'], team['entry_name'], team['player_name'], gw_points,
+                                team_picks['base_total'] + gw_points, 0,
+                                team_picks['team_value'], team_picks['bank_balance'])
+        current_data = assign_league_ranks(current_data)
+        results[league_id] = store_league_gameweek(gameweek, current_data, league_id)
+    return results
+
+def get_fpl_data(gameweek, league_id=LEAGUE_ID):
+    """Fetch and process FPL data for a specific gameweek.
+
+    Concurrent callers for the same league and gameweek share one load, so a
+    gameweek missing from the database is fetched from the API only once.
+    """
+    return single_flight(('load', gameweek), [league_id],
+                         lambda owned: {league_id: _load_gameweek(gameweek, league_id)})[league_id]
+
+def revalidate_in_background(gameweek, league_id):
+    """Refetch a gameweek on its own thread unless it is already being stored."""
+    if is_in_flight(('store', gameweek), league_id):
+        return
+    threading.Thread(target=ingest_gameweek, args=(gameweek, [league_id]), daemon=True,
+                     name=f'fpl-revalidate-{league_id}-{gameweek}').start()
+
+def _load_gameweek(gameweek, league_id):
     # First try to get historical data from database
-    historical_data = get_historical_data(gameweek)
-    if historical_data and any(team['gw_points'] > 0 for team in historical_data):
+    historical_data = get_historical_data(gameweek, league_id)
+    if historical_data.has_points():
         # Get previous gameweek data for gameweek champion calculation
-        previous_data = get_historical_data(gameweek - 1) if gameweek > 1 else None
+        previous_data = get_historical_data(gameweek - 1, league_id) if gameweek > 1 else None
         
         # Calculate all awards
         awards = calculate_awards(historical_data)
@@ -307,119 +1848,202 @@ def get_fpl_data(gameweek):
         }
 
     # If no historical data or all points are 0, try to get from JSON cache
-    cache_file = f'cache/gameweek_{gameweek}.json'
-    cached_data = load_data_from_json(cache_file)
+    cached_data = load_data_from_json(gameweek_cache_file(gameweek, league_id))
     if cached_data and any(team['gw_points'] > 0 for team in cached_data.get('standings', [])):
         return cached_data
 
+    # An expired cache file is served while it is refreshed
+    if SERVE_STALE:
+        stale_data = load_data_from_json(gameweek_cache_file(gameweek, league_id), max_age=None)
+        if stale_data and any(team['gw_points'] > 0 for team in stale_data.get('standings', [])):
+            revalidate_in_background(gameweek, league_id)
+            return stale_data
+
     # If no cached data or all points are 0, fetch from API
-    league_id = 1658794
-    league_url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/"
-    league_data = fetch_data(league_url)
+    return ingest_gameweek(gameweek, [league_id])[league_id]
 
-    if not league_data:
-        return None
+def fetch_entry_history(team_id):
+    """Fetch an entry's per-gameweek history for the whole season, or None on failure.
 
-    standings = league_data['standings']['results']
-    current_data = []
-    
-    for team in standings:
-        team_id = team['entry']
-        team_name = team['entry_name']
-        manager_name = team['player_name']
-        rank = team['rank']
-
-        # Fetch gameweek points and other info
-        gw_url = f"https://fantasy.premierleague.com/api/entry/{team_id}/event/{gameweek}/picks/"
-        gw_data = fetch_data(gw_url)
-
-        if gw_data and 'entry_history' in gw_data:
-            gw_points = gw_data['entry_history']['points']
-            total_points = gw_data['entry_history']['total_points']
-            team_value = gw_data['entry_history']['value'] / 10
-            bank_balance = gw_data['entry_history']['bank'] / 10
+    An entry the API doesn't know (404) has no history rather than a failed one.
+    """
+    history = fetch_data(f"{FPL_API_BASE}/entry/{team_id}/history/", not_found=NOT_FOUND)
+    if history is NOT_FOUND:
+        return []
+    if history and 'current' in history:
+        return history['current']
+    return None
+
+def assign_league_ranks(data):
+    """Rank teams within the league by total points, sharing ranks on ties."""
+    totals = data.total_points
+    ordered = data.take(sorted(range(len(data)), key=lambda index: totals[index], reverse=True))
+    previous_total = None
+    rank = 0
+    for position, total in enumerate(ordered.total_points, start=1):
+        if total != previous_total:
+            rank = position
+            previous_total = total
+        ordered.rank[position - 1] = rank
+    return ordered
+
+def backfill_season(league_ids=None, team_ids=None):
+    """Bulk-load every gameweek from each manager's season history.
+
+    Costs the standings pages plus one history request per distinct manager
+    instead of a standings and picks request per manager for every gameweek.
+    Passing ``team_ids`` only fetches those managers (e.g. one who joined
+    mid-season) and merges them with the rows already stored for everyone else.
+    """
+    import pandas as pd
+
+    league_ids = league_ids or LEAGUE_IDS
+    wanted = set(team_ids) if team_ids is not None else None
+
+    def fetch_history(team_id):
+        if wanted is not None and team_id not in wanted:
+            return []
+        history = fetch_entry_history(team_id)
+        # Keep only the fields stored below while the rest of the league is fetched
+        return history and [(event['event'], event['points'], event['total_points'],
+                             event['value'] / 10, event['bank'] / 10) for event in history]
+
+    leagues, futures = fetch_league_entries(league_ids, fetch_history)
+
+    loaded = {}
+    for league_id, standings in leagues.items():
+        if standings is None:
+            logger.warning(f"Backfill failed for league {league_id}: could not fetch standings")
+            continue
+        failed = [team['entry'] for team in standings if futures[team['entry']].result() is None]
+        if failed:
+            logger.warning(f"Backfill failed for league {league_id}: could not fetch {len(failed)} histories")
+            continue
+        if wanted is None:
+            _backfilled_leagues.add(league_id)
         else:
-            # Try to get data from the current gameweek endpoint
-            current_url = f"https://fantasy.premierleague.com/api/entry/{team_id}/"
-            current_data = fetch_data(current_url)
-            if current_data and 'current_event' in current_data:
-                gw_points = current_data['current_event']['points']
-                total_points = current_data['current_event']['total_points']
-                team_value = current_data['current_event']['value'] / 10
-                bank_balance = current_data['current_event']['bank'] / 10
-            else:
-                gw_points = 0
-                total_points = 0
-                team_value = 0
-                bank_balance = 0
-
-        team_data = {
-            'team_id': team_id,
-            'team_name': team_name,
-            'manager_name': manager_name,
-            'gw_points': gw_points,
-            'total_points': total_points,
-            'rank': rank,
-            'team_value': team_value,
-            'bank_balance': bank_balance
-        }
-        current_data.append(team_data)
+            standings = [team for team in standings if team['entry'] in wanted]
 
-    # Only store data if we have valid points
-    if any(team['gw_points'] > 0 for team in current_data):
-        store_fpl_data(gameweek, current_data)
-        
-        # Get previous gameweek data for comparison
-        previous_data = get_historical_data(gameweek - 1) if gameweek > 1 else None
-        if previous_data:
-            previous_ranks = {team['team_id']: team['rank'] for team in previous_data}
-            for team in current_data:
-                if team['team_id'] in previous_ranks:
-                    team['rank_change'] = previous_ranks[team['team_id']] - team['rank']
+        by_gameweek = {}
+        for team in standings:
+            for gameweek, points, total_points, team_value, bank_balance in futures[team['entry']].result():
+                by_gameweek.setdefault(gameweek, Standings()).append(
+                    team['entry'], team['entry_name'], team['player_name'], points,
+                    total_points, 0, team_value, bank_balance)
 
-        # Calculate all awards
-        awards = calculate_awards(current_data)
-        awards['gameweek_champion'] = calculate_gameweek_champion(gameweek, current_data, previous_data)
-        
-        # Store award winners
-        store_award_winners(gameweek, current_data, awards['gameweek_champion'])
+        loaded[league_id] = []
+        season = {'gameweek': array('q'), 'team_id': array('q'), 'team_name': [],
+                  'manager_name': [], 'gw_points': array('q')}
+        changed = set()
+        for gameweek in range(1, max(by_gameweek, default=0) + 1):
+            current_data = by_gameweek.pop(gameweek, Standings())
+            if wanted is not None:
+                fetched_ids = set(current_data.team_id)
+                current_data = Standings(itertools.chain(current_data.records(), (
+                    record for record in get_historical_data(gameweek, league_id).records()
+                    if record[0] not in fetched_ids)))
 
-        result_data = {
-            'standings': current_data,
-            'awards': awards
-        }
+            if not current_data.has_points():
+                continue
 
-        # Cache the result
-        os.makedirs('cache', exist_ok=True)
-        save_data_to_json(result_data, cache_file)
+            current_data = assign_league_ranks(current_data)
+            if store_fpl_data(gameweek, current_data, league_id):
+                changed.update((gameweek, gameweek + 1))
+            season['gameweek'].extend([gameweek] * len(current_data))
+            for column in ('team_id', 'team_name', 'manager_name', 'gw_points'):
+                season[column].extend(getattr(current_data, column))
+            loaded[league_id].append(gameweek)
 
-        return result_data
-    
-    return None
+        # Awards for every loaded gameweek in one pass, rewritten only where standings
+        # changed (a gameweek's champion also depends on the previous gameweek)
+        winners = find_award_winners(pd.DataFrame(season))
+        winners = winners[winners['gameweek'].isin(changed)]
+        if len(winners):
+            store_season_awards(winners, league_id)
+
+        logger.info(f"Backfilled league {league_id} gameweeks {loaded[league_id]} "
+              f"for {len(standings)} managers")
+    return loaded
+
+def backfill_missing_gameweeks(league_ids=None):
+    """Backfill the leagues whose stored season has gaps, e.g. after a fresh deploy or downtime.
+
+    Concurrent callers share one backfill per league, and a league whose
+    backfill failed is not retried for BACKFILL_RETRY_AFTER seconds. Returns
+    the leagues that still have gaps.
+    """
+    gaps = [league_id for league_id in league_ids or LEAGUE_IDS
+            if season_needs_backfill(get_scored_gameweeks(league_id), league_id)]
+    due = [league_id for league_id in gaps
+           if time.time() - _backfill_failures.get(league_id, 0) >= BACKFILL_RETRY_AFTER]
+    if not due:
+        return gaps
+    try:
+        loaded = single_flight(('backfill',), due, backfill_season)
+    except Exception as e:
+        logger.error(f"Backfill failed for leagues {due}: {e}")
+        loaded = {}
+    for league_id in due:
+        if loaded.get(league_id) is None:
+            _backfill_failures[league_id] = time.time()
+        else:
+            gaps.remove(league_id)
+    return gaps
+
+def get_events(max_age=EVENTS_TTL):
+    """Return the season's event list from bootstrap-static, cached for ``max_age`` seconds."""
+    with _events_lock:
+        if (_events_cache['events'] is not None
+                and time.time() - _events_cache['fetched_at'] < max_age):
+            return _events_cache['events']
+
+        data = fetch_data(f'{FPL_API_BASE}/bootstrap-static/')
+        if data and 'events' in data:
+            _events_cache['events'] = data['events']
+            # Player id -> (position type, club id), needed for live auto-subs
+            _events_cache['elements'] = {element['id']: (element['element_type'], element['team'])
+                                         for element in data.get('elements', [])}
+            _events_cache['fetched_at'] = time.time()
+        elif _events_cache['events'] is not None:
+            logger.warning("Could not refresh event metadata, using cached copy")
+        return _events_cache['events']
+
+def gameweek_is_final(gameweek):
+    """Whether a gameweek is finished and data_checked, so its picks can no longer change."""
+    event = next((event for event in get_events() or [] if event['id'] == gameweek), None)
+    return bool(event and event['finished'] and event['data_checked'])
+
+def resolve_current_gameweek(events):
+    """Pick the current gameweek from bootstrap-static events.
+
+    Before the first deadline there is no current event, so this falls back to
+    the most recent finished event and finally to gameweek 1.
+    """
+    current_event = next((event for event in events if event['is_current']), None)
+    if current_event:
+        return current_event['id']
+    finished = [event['id'] for event in events if event['finished']]
+    return max(finished) if finished else 1
 
 def get_latest_valid_gameweek():
-    """Find the latest gameweek that has valid data (not all zeros)."""
+    """Find the current gameweek from event metadata, without probing per-team data."""
     try:
-        # Start from gameweek 38 and work backwards
-        for gameweek in range(38, 0, -1):
-            print(f"Checking gameweek {gameweek}")
-            data = get_fpl_data(gameweek)
-            
-            # Check if we have valid data with points
-            if data and data.get('standings'):
-                # Check if any team has points in this gameweek
-                if any(team.get('gw_points', 0) > 0 for team in data['standings']):
-                    print(f"Found valid data in gameweek {gameweek}")
-                    return gameweek
-                else:
-                    print(f"Gameweek {gameweek} has no points data")
-            else:
-                print(f"No data found for gameweek {gameweek}")
-        
-        print("No valid data found in any gameweek")
+        events = get_events()
+        if events:
+            gameweek = resolve_current_gameweek(events)
+            logger.debug(f"Current gameweek from event metadata: {gameweek}")
+            return gameweek
+
+        # Upstream unavailable: fall back to the newest gameweek we have stored
+        gameweeks = get_available_gameweeks()
+        if gameweeks:
+            logger.warning(f"Event metadata unavailable, using latest stored gameweek {gameweeks[-1]}")
+            return gameweeks[-1]
+
+        logger.warning("No valid data found in any gameweek")
         return 1  # Default to gameweek 1 if no valid data found
     except Exception as e:
-        print(f"Error in get_latest_valid_gameweek: {e}")
+        logger.error(f"Error in get_latest_valid_gameweek: {e}")
         return 1  # Default to gameweek 1 on error
 
 def fetch_current_gameweek():
@@ -428,105 +2052,193 @@ def fetch_current_gameweek():
 
 def preload_data():
     """Preload data for latest valid gameweek."""
-    print("Preloading FPL data...")
+    logger.info("Preloading FPL data...")
     latest_gw = get_latest_valid_gameweek()
-    print(f"Latest valid gameweek: {latest_gw}")
+    logger.info(f"Latest valid gameweek: {latest_gw}")
     
-    try:
-        data = get_fpl_data(latest_gw)
-        if data:
-            print(f"Successfully loaded gameweek {latest_gw}")
-        else:
-            print(f"Failed to load gameweek {latest_gw}")
-    except Exception as e:
-        print(f"Error loading gameweek {latest_gw}: {e}")
+    for league_id in LEAGUE_IDS:
+        try:
+            data = get_fpl_data(latest_gw, league_id)
+            if data:
+                logger.info(f"Successfully loaded league {league_id} gameweek {latest_gw}")
+            else:
+                logger.warning(f"Failed to load league {league_id} gameweek {latest_gw}")
+        except Exception as e:
+            logger.error(f"Error loading league {league_id} gameweek {latest_gw}: {e}")
     
-    print("Data preloading complete!")
+    logger.info("Data preloading complete!")
 
 def is_game_active():
     """Check if there's an active FPL gameweek."""
     try:
-        response = requests.get('https://fantasy.premierleague.com/api/bootstrap-static/', verify=False)
-        if response.status_code == 200:
-            data = response.json()
-            events = data['events']
-            for event in events:
-                if event['is_current']:
-                    # Check if the gameweek is active (has started but not finished)
-                    return event['is_current'] and not event['finished']
+        events = get_events()
+        for event in events or []:
+            if event['is_current']:
+                # Check if the gameweek is active (has started but not finished)
+                return event['is_current'] and not event['finished']
         return False
     except Exception as e:
-        print(f"Error checking game status: {e}")
+        logger.error(f"Error checking game status: {e}")
         return False
 
+def get_fixtures(gameweek, max_age=LIVE_REFRESH_INTERVAL // 2):
+    """Fetch the fixture list for a gameweek, or None if it is unavailable.
+
+    Results are reused for ``max_age`` seconds so the scheduler and the live
+    points engine share one request per tick.
+    """
+    cached = _fixtures_cache.get(gameweek)
+    if cached and time.time() - cached[1] < max_age:
+        return cached[0]
+    fixtures = fetch_data(f"{FPL_API_BASE}/fixtures/?event={gameweek}")
+    if fixtures is not None:
+        _fixtures_cache[gameweek] = (fixtures, time.time())
+    return fixtures
+
+def parse_fpl_time(value):
+    """Parse an FPL API timestamp such as '2024-08-16T19:00:00Z'."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def seconds_until(moment, now):
+    """Seconds from ``now`` until ``moment``, clamped to the scheduler's bounds."""
+    if moment is None:
+        return MAX_REFRESH_INTERVAL
+    delay = (moment - now).total_seconds()
+    return int(max(LIVE_REFRESH_INTERVAL, min(MAX_REFRESH_INTERVAL, delay)))
+
+def next_kickoff(event, fixtures_for):
+    """Earliest kickoff of an upcoming event, falling back to its deadline."""
+    if event is None:
+        return None
+    fixtures = fixtures_for(event['id']) or []
+    kickoffs = [parse_fpl_time(fixture['kickoff_time'])
+                for fixture in fixtures if fixture.get('kickoff_time')]
+    if kickoffs:
+        return min(kickoffs)
+    return parse_fpl_time(event['deadline_time'])
+
+def plan_refresh(events, fixtures_for, now, was_live=False):
+    """Decide what the refresher should fetch this tick and how long to sleep.
+
+    Returns ``(gameweek, delay, live)`` where ``gameweek`` is None when nothing
+    needs fetching. Matches in progress are polled every
+    LIVE_REFRESH_INTERVAL. Between matchdays the refresher fetches once after
+    the last live tick and then sleeps until the next kickoff. Once an event
+    is finished and data_checked it is fetched one final time and never again.
+    """
+    if not events:
+        return None, DEFAULT_REFRESH_INTERVAL, False
+
+    current = next((event for event in events if event['is_current']), None)
+    upcoming = next((event for event in events if event.get('is_next')), None)
+
+    if current is None:
+        # Pre-season: nothing to score until the first kickoff
+        return None, seconds_until(next_kickoff(upcoming, fixtures_for), now), False
+
+    gameweek = current['id']
+    if current['finished'] and current['data_checked']:
+        delay = seconds_until(next_kickoff(upcoming, fixtures_for), now)
+        if gameweek in _finalized_gameweeks:
+            return None, delay, False
+        return gameweek, delay, False
+
+    fixtures = fixtures_for(gameweek)
+    if fixtures is None:
+        return gameweek, DEFAULT_REFRESH_INTERVAL, False
+
+    if any(fixture['started'] and not fixture['finished_provisional'] for fixture in fixtures):
+        return gameweek, LIVE_REFRESH_INTERVAL, True
+
+    kickoffs = [parse_fpl_time(fixture['kickoff_time']) for fixture in fixtures
+                if not fixture['started'] and fixture.get('kickoff_time')]
+    if kickoffs:
+        # Between matchdays (or between the deadline and the first kickoff)
+        return (gameweek if was_live else None), seconds_until(min(kickoffs), now), False
+
+    # Every match is over; poll slowly until bonus points are confirmed
+    return gameweek, SETTLING_REFRESH_INTERVAL, False
+
 def refresh_data_periodically():
-    """Periodically refresh FPL data."""
+    """Refresh FPL data on a schedule driven by event and fixture status."""
+    was_live = False
     while True:
+        start = time.perf_counter()
         try:
-            # Get the latest valid gameweek
-            current_gw = get_latest_valid_gameweek()
-            if current_gw is None:
-                print("Could not determine current gameweek, retrying in 5 minutes...")
-                time.sleep(300)
-                continue
+            events = get_events()
+            gameweek, delay, was_live = plan_refresh(
+                events, get_fixtures, datetime.now(timezone.utc), was_live)
 
-            # Fetch and store data for the current gameweek
-            data = get_fpl_data(current_gw)
-            if data:
-                store_fpl_data(current_gw, data)
-                
-                # Get previous gameweek data for comparison
-                if current_gw > 1:
-                    prev_data = get_fpl_data(current_gw - 1)
-                    if prev_data:
-                        gameweek_champions = calculate_gameweek_champion(current_gw, data, prev_data)
-                        store_award_winners(current_gw, data, gameweek_champions)
-                
-                print(f"Successfully updated data for gameweek {current_gw}")
+            if gameweek is not None:
+                event = next((event for event in events or [] if event['id'] == gameweek), None)
+                final = bool(event and event['finished'] and event['data_checked'])
+                # Score in-progress gameweeks from the live feed; the final
+                # fetch reads the official per-entry numbers
+                if final or event is None:
+                    results = ingest_gameweek(gameweek)
+                else:
+                    results = ingest_live_gameweek(gameweek)
+                for league_id, data in results.items():
+                    if data:
+                        logger.info(f"Successfully updated league {league_id} data for gameweek {gameweek}")
+                    else:
+                        logger.warning(f"Failed to fetch league {league_id} data for gameweek {gameweek}")
+
+                if final and all(results.values()):
+                    _finalized_gameweeks.add(gameweek)
+                    logger.info(f"Gameweek {gameweek} is final, it will not be fetched again")
+
+            # Fill earlier gameweeks missed while the app wasn't running
+            backfill_missing_gameweeks()
+
+            observe('fpl_refresh_duration_seconds', time.perf_counter() - start)
+            if gameweek is None or all(results.values()):
+                set_gauge('fpl_refresh_last_success_timestamp_seconds', time.time())
             else:
-                print(f"Failed to fetch data for gameweek {current_gw}")
+                inc_counter('fpl_refresh_failures_total')
 
-            # Wait for 5 minutes before next refresh
-            time.sleep(300)
+            logger.debug(f"Next refresh in {delay} seconds")
+            time.sleep(delay)
             
         except Exception as e:
-            print(f"Error in periodic refresh: {e}")
+            observe('fpl_refresh_duration_seconds', time.perf_counter() - start)
+            inc_counter('fpl_refresh_failures_total')
+            logger.exception(f"Error in periodic refresh: {e}")
             # Wait for 1 minute before retrying after an error
             time.sleep(60)
 
 def force_refresh_all_gameweeks():
-    print('Forcing refresh for all gameweeks...')
-    for gw in range(1, 39):
-        print(f'Forcing refresh for gameweek {gw}')
-        get_fpl_data(gw)
-    print('Full refresh complete!')
+    logger.info('Forcing refresh for all gameweeks...')
+    backfill_season()
+    logger.info('Full refresh complete!')
 
-def get_available_gameweeks():
+@timed('fpl_db_query_duration_seconds', 'helper')
+def get_available_gameweeks(league_id=LEAGUE_ID):
     """Get list of available gameweeks from the database."""
-    print("Fetching available gameweeks...")
+    logger.debug("Fetching available gameweeks...")
     try:
-        conn = sqlite3.connect('fpl_history.db')
-        c = conn.cursor()
-        c.execute('SELECT DISTINCT gameweek FROM fpl_data ORDER BY gameweek')
+        c = get_db().cursor()
+        c.execute('''SELECT DISTINCT gameweek FROM fpl_data
+                     WHERE league_id = ? AND season = ? ORDER BY gameweek''',
+                  (league_id, SEASON))
         gameweeks = [row[0] for row in c.fetchall()]
-        conn.close()
-        print(f"Found gameweeks: {gameweeks}")
+        logger.debug(f"Found gameweeks: {gameweeks}")
         return gameweeks
     except Exception as e:
-        print(f"Error fetching available gameweeks: {e}")
+        logger.error(f"Error fetching available gameweeks: {e}")
         return []
 
-def read_gameweek_data(gameweek):
+def read_gameweek_data(gameweek, league_id=LEAGUE_ID):
     """Read and display data for a specific gameweek."""
-    conn = sqlite3.connect('fpl_history.db')
-    c = conn.cursor()
+    c = get_db().cursor()
     
     print(f"\nGameweek {gameweek} Data:")
     print("-" * 50)
     
     # Get standings data
     c.execute('''SELECT team_name, manager_name, gw_points, total_points, rank 
-                 FROM fpl_data WHERE gameweek = ? ORDER BY rank''', (gameweek,))
+                 FROM fpl_data WHERE league_id = ? AND season = ? AND gameweek = ?
+                 ORDER BY rank''', (league_id, SEASON, gameweek))
     standings = c.fetchall()
     
     print("Standings:")
@@ -535,170 +2247,846 @@ def read_gameweek_data(gameweek):
     
     # Get award winners
     c.execute('''SELECT award_type, team_name, manager_name, points 
-                 FROM award_winners WHERE gameweek = ?''', (gameweek,))
+                 FROM award_winners WHERE league_id = ? AND season = ? AND gameweek = ?''',
+              (league_id, SEASON, gameweek))
     awards = c.fetchall()
     
     print("\nAwards:")
     for award in awards:
         print(f"{award[0]}: {award[1]} ({award[2]}) - {award[3]} points")
-    
-    conn.close()
+
+def compress_variants(body):
+    """Return the body in every content-coding we can serve, keyed by coding."""
+    variants = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body)
+    return variants
+
+def choose_encoding(accept_encoding, available):
+    """Pick the smallest acceptable content-coding from an Accept-Encoding header."""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    for coding in ('br', 'gzip'):
+        if coding in available and coding in accepted:
+            return coding
+    return 'identity'
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return etag in candidates or f'W/{etag}' in candidates
+
+def build_static_asset(body, content_type, cache_control):
+    """Precompute the encoded bodies and ETags for one static file."""
+    digest = hashlib.sha1(body).hexdigest()[:16]
+    return {
+        'content_type': content_type,
+        'cache_control': cache_control,
+        'version': digest,
+        'bodies': compress_variants(body),
+        'etags': {coding: f'"{digest}-{coding}"' for coding in ('identity', 'gzip', 'br')},
+    }
+
+def load_static_assets():
+    """Read static files into memory with precompressed variants.
+
+    CSS and JS are referenced from index.html with a content-hash query
+    string, so they can be cached as immutable. index.html itself must be
+    revalidated, which costs a 304 when nothing changed.
+    """
+    assets = {}
+    for path, (filename, content_type) in STATIC_FILES.items():
+        if path == '/':
+            continue
+        with open(filename, 'rb') as f:
+            assets[path] = build_static_asset(
+                f.read(), content_type, 'public, max-age=31536000, immutable')
+
+    filename, content_type = STATIC_FILES['/']
+    with open(filename, 'rb') as f:
+        index = f.read()
+    for path, asset in assets.items():
+        name = path.lstrip('/').encode()
+        index = index.replace(b'"' + name + b'"',
+                              b'"' + name + b'?v=' + asset['version'].encode() + b'"')
+    assets['/'] = build_static_asset(index, content_type, 'no-cache')
+
+    with _static_lock:
+        _static_assets.clear()
+        _static_assets.update(assets)
+    logger.info(f"Loaded {len(assets)} static assets into memory")
+
+def get_static_asset(path):
+    """Return the preloaded asset for a request path, loading assets on first use."""
+    if not _static_assets:
+        load_static_assets()
+    return _static_assets.get(path)
+
+# Live update stream: /api/stream clients are detached from the HTTP worker
+# pool and written to by one broadcaster thread, so idle subscribers cost a
+# socket each rather than a worker. Each socket maps to its league and the
+# output it has not taken yet.
+_stream_clients = {}
+_stream_snapshots = {}
+_stream_queue = queue.Queue()
+_stream_lock = threading.Lock()
+_stream_thread = None
+
+def format_stream_event(event, payload, event_id=None):
+    """Encode one Server-Sent Event."""
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(payload, separators=(",", ":"))}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+def publish_standings_update(gameweek, league_id, data):
+    """Queue the rows of a stored gameweek that changed since the last update.
+
+    Only the latest gameweek of each league is remembered; a different
+    gameweek is sent in full. Awards are small and always sent whole.
+    """
+    standings = data['standings']
+    with _stream_lock:
+        previous_gameweek, previous = _stream_snapshots.get(league_id, (None, Standings()))
+        _stream_snapshots[league_id] = (gameweek, standings)
+        if previous_gameweek != gameweek:
+            previous = Standings()
+        previous_rows = dict(zip(previous.team_id, zip(previous.records(), previous.rank_change)))
+        changed = [standings.row(index) for index, row in enumerate(
+                       zip(standings.records(), standings.rank_change))
+                   if previous_rows.get(row[0][0]) != row]
+        current_ids = set(standings.team_id)
+        removed = [team_id for team_id in previous.team_id if team_id not in current_ids]
+        if not (changed or removed) or not _stream_clients:
+            return
+
+    version = get_data_version()
+    _stream_queue.put((league_id, format_stream_event('standings', {
+        'league_id': league_id,
+        'gameweek': gameweek,
+        'version': version,
+        'standings': changed,
+        'removed': removed,
+        'awards': data['awards'],
+    }, version)))
+
+def send_stream_message(sock, client, message=b''):
+    """Write to a non-blocking subscriber, buffering what its socket can't take yet.
+
+    Returns False if the subscriber is gone or more than STREAM_BUFFER_LIMIT
+    bytes behind.
+    """
+    pending = client['pending']
+    pending += message
+    if len(pending) > STREAM_BUFFER_LIMIT:
+        return False
+    try:
+        sent = sock.send(pending)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    del pending[:sent]
+    return True
+
+def broadcast_stream():
+    """Fan queued events out to subscribers and keep idle connections alive.
+
+    Subscribers with buffered output are watched for writability and flushed
+    between events.
+    """
+    selector = selectors.DefaultSelector()
+    last_sent = time.monotonic()
+    while True:
+        with _stream_lock:
+            clients = list(_stream_clients.items())
+        dropped = []
+        timeout = max(0, last_sent + STREAM_HEARTBEAT - time.monotonic())
+        backlog = {sock: client for sock, client in clients if client['pending']}
+        for key in list(selector.get_map().values()):
+            if key.fileobj not in backlog:
+                selector.unregister(key.fileobj)
+        if backlog:
+            for sock in backlog:
+                if sock not in selector.get_map():
+                    selector.register(sock, selectors.EVENT_WRITE)
+            # Come back for new events soon while slow subscribers drain
+            for key, _ in selector.select(min(timeout, 0.1)):
+                if not send_stream_message(key.fileobj, backlog[key.fileobj]):
+                    dropped.append(key.fileobj)
+            timeout = 0
+
+        try:
+            league_id, message = _stream_queue.get(timeout=timeout)
+        except queue.Empty:
+            league_id, message = None, None
+            if time.monotonic() - last_sent >= STREAM_HEARTBEAT:
+                message = b': ping\n\n'
+        if message is not None:
+            last_sent = time.monotonic()
+            dropped.extend(sock for sock, client in clients
+                           if sock not in dropped
+                           and (league_id is None or client['league_id'] == league_id)
+                           and not send_stream_message(sock, client, message))
+
+        if dropped:
+            with _stream_lock:
+                for sock in dropped:
+                    _stream_clients.pop(sock, None)
+            for sock in dropped:
+                if sock in selector.get_map():
+                    selector.unregister(sock)
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+def subscribe_stream(sock, league_id):
+    """Hand a connection whose stream headers were sent over to the broadcaster."""
+    global _stream_thread
+    sock.setblocking(False)
+    with _stream_lock:
+        _stream_clients[sock] = {'league_id': league_id, 'pending': bytearray()}
+        if _stream_thread is None:
+            _stream_thread = threading.Thread(target=broadcast_stream, daemon=True,
+                                              name='fpl-stream')
+            _stream_thread.start()
+
+# Unscoped API routes, with path parameters collapsed, used as metric labels
+API_ROUTES = {'/api/leagues', '/api/stream', '/api/gameweeks', '/api/current-gameweek',
+              '/api/award-summary', '/api/all-data', '/api/data/:gameweek',
+              '/api/awards-history/:award_type', '/api/team/:team_id/history'}
+
+def route_label(path):
+    """Collapse a request path into a low-cardinality route for metrics."""
+    if path in STATIC_FILES or path in ('/metrics', '/healthz', '/readyz'):
+        return path
+    prefix = ''
+    if path.startswith('/api/league/'):
+        prefix, path = '/api/league/:league_id', '/api/' + path[len('/api/league/'):].partition('/')[2]
+    path = re.sub(r'^/api/data/[^/]+$', '/api/data/:gameweek', path)
+    path = re.sub(r'^/api/awards-history/[^/]+$', '/api/awards-history/:award_type', path)
+    path = re.sub(r'^/api/team/[^/]+/history$', '/api/team/:team_id/history', path)
+    if path not in API_ROUTES:
+        return 'other'
+    return prefix + path[len('/api'):] if prefix else path
+
+class ReadAheadStream(io.RawIOBase):
+    """Raw reader that returns bytes already read off a socket before reading it again."""
+
+    def __init__(self, buffered, stream):
+        self.buffered = buffered
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self.buffered:
+            size = min(len(b), len(self.buffered))
+            b[:size] = self.buffered[:size]
+            self.buffered = self.buffered[size:]
+            return size
+        return self.stream.readinto1(b)
+
+    def close(self):
+        self.stream.close()
+        super().close()
 
 class FPLHandler(BaseHTTPRequestHandler):
+    # Keep connections alive between requests; every response sets Content-Length
+    # or is sent with chunked transfer encoding
+    protocol_version = 'HTTP/1.1'
+    # Seconds a connection may sit idle or half-sent; the server waits for each
+    # request head on its selector, so neither holds a worker
+    timeout = 15
+    detached = False
+    parked = False
+    unread = b''
+
+    def setup(self):
+        super().setup()
+        # Continue from the bytes the server read while waiting for the request head
+        take_buffered = getattr(self.server, 'take_buffered', None)
+        if take_buffered:
+            self.rfile = io.BufferedReader(ReadAheadStream(take_buffered(self.request), self.rfile))
+
+    def handle(self):
+        """Serve one request, then hand the connection back to be parked until the next."""
+        self.close_connection = True
+        self.handle_one_request()
+        if not self.close_connection and not self.detached:
+            self.unread = self.read_unread()
+            self.parked = True
+
+    def read_unread(self):
+        """Return what has arrived of the next request without waiting for more."""
+        self.connection.setblocking(False)
+        chunks = []
+        try:
+            while sum(map(len, chunks)) < MAX_REQUEST_HEAD:
+                chunk = self.rfile.read1(MAX_REQUEST_HEAD)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except OSError:
+            pass
+        finally:
+            self.connection.settimeout(self.timeout)
+        return b''.join(chunks)
+
+    def send_body(self, body, content_type, status=200):
+        """Send a complete response with an explicit Content-Length."""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_static(self, asset, head=False):
+        """Send a preloaded static asset, honouring Accept-Encoding and If-None-Match."""
+        coding = choose_encoding(self.headers.get('Accept-Encoding'), asset['bodies'])
+        etag = asset['etags'][coding]
+        not_modified = etag_matches(self.headers.get('If-None-Match'), etag)
+        if not_modified:
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header('Content-type', asset['content_type'])
+            self.send_header('Content-Length', str(len(asset['bodies'][coding])))
+            if coding != 'identity':
+                self.send_header('Content-Encoding', coding)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', asset['cache_control'])
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        if not head and not not_modified:
+            self.wfile.write(asset['bodies'][coding])
+
+    def send_json(self, key, build, changed_at=None, upstream=False):
+        """Send an API response with a data-version ETag and optional gzip.
+
+        ``build`` is only called when the client's copy is out of date and
+        returns the body as bytes, or as an iterator of chunks that is sent with
+        chunked transfer encoding. Returns False if it produced nothing so the
+        caller can send an error instead. ``changed_at`` is called once a full
+        body is being sent and returns its change time for Last-Modified, or None.
+        An ``upstream`` build, one that may wait on the FPL API, needs a free
+        upstream slot and is answered with 503 when there is none.
+        """
+        # Read the version before building so the ETag is never newer than the body
+        etag = f'W/"{get_data_version()}"'
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            inc_counter('fpl_cache_requests_total', (('cache', 'client'), ('result', 'hit')))
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return True
+
+        slots = getattr(self.server, 'upstream_slots', None)
+        if not upstream or slots is None:
+            return self.send_built(key, build, etag, changed_at)
+        if not slots.acquire(blocking=False):
+            self.send_busy()
+            return True
+        try:
+            return self.send_built(key, build, etag, changed_at)
+        finally:
+            slots.release()
+
+    def send_busy(self):
+        """Answer 503 while every upstream slot is taken, asking the client to retry shortly."""
+        body = b'{"error": "busy"}'
+        self.send_response(503)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_built(self, key, build, etag, changed_at):
+        """Build a response body and send it with a 200; the rest of send_json."""
+        body = build()
+        if not body:
+            return False
+        if not isinstance(body, bytes):
+            self.send_chunked(etag, body)
+            return True
+
+        coding = 'identity'
+        if len(body) >= 512:
+            coding = choose_encoding(self.headers.get('Accept-Encoding'), ('gzip',))
+        if coding == 'gzip':
+            body = get_compressed_response(key, etag, body)
+        changed = changed_at() if changed_at else None
+        last_modified = format_datetime(changed, usegmt=True) if changed else None
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if coding != 'identity':
+            self.send_header('Content-Encoding', coding)
+        self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
+    def send_chunked(self, etag, chunks):
+        """Send a JSON body as it is produced, gzipped on the fly when accepted.
+
+        HTTP/1.0 clients get the raw body with the connection closed at the end.
+        A failure part-way through drops the connection so the client sees a
+        truncated response rather than a silently incomplete one.
+        """
+        coding = choose_encoding(self.headers.get('Accept-Encoding'), ('gzip',))
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if coding == 'gzip' else None
+        chunked = self.request_version != 'HTTP/1.0'
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        if coding != 'identity':
+            self.send_header('Content-Encoding', coding)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+
+        def write(data):
+            if data:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data) if chunked else data)
+
+        try:
+            for chunk in chunks:
+                write(compressor.compress(chunk) if compressor else chunk)
+            if compressor:
+                write(compressor.flush())
+        except Exception as e:
+            logger.error(f"Streaming response failed: {e}")
+            self.close_connection = True
+            return
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    def start_stream(self, league_id):
+        """Open a Server-Sent Events stream of standings updates for a league.
+
+        The connection is handed to the broadcaster and this worker is freed.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        self.wfile.write(b'retry: 5000\n\n' + format_stream_event(
+            'hello', {'league_id': league_id, 'version': get_data_version()}))
+        self.wfile.flush()
+        self.close_connection = True
+        self.detached = True
+        subscribe_stream(self.connection, league_id)
+
     def do_HEAD(self):
         """Handle HEAD requests."""
+        asset = get_static_asset(urlparse(self.path).path)
+        if asset:
+            self.send_static(asset, head=True)
+            return
         self.send_response(200)
         self.send_header('Content-type', 'text/html')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
+    def log_message(self, format, *args):
+        """Route the access log through the app logger at DEBUG."""
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def send_response(self, code, message=None):
+        self.response_status = code
+        super().send_response(code, message)
+
     def do_GET(self):
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
+        path = urlparse(self.path).path
+        start = time.perf_counter()
+        self.response_status = None
+        try:
+            self.route_get(path)
+        finally:
+            route = route_label(path)
+            observe('fpl_http_request_duration_seconds', time.perf_counter() - start,
+                    (('route', route),))
+            inc_counter('fpl_http_requests_total',
+                        (('route', route), ('status', str(self.response_status or 'aborted'))))
+
+    def route_get(self, path):
+        logger.debug(f"Received request for path: {path}")
         
-        print(f"Received request for path: {path}")
+        asset = get_static_asset(path)
+        if asset:
+            # Serve index.html, styles.css and script.js from memory
+            self.send_static(asset)
         
-        if path == '/':
-            # Serve the main HTML page
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            with open('index.html', 'rb') as f:
-                self.wfile.write(f.read())
-            print("Served index.html")
+        elif path == '/healthz':
+            # The process is up and serving
+            self.send_body(b'{"status": "ok"}', 'application/json')
         
-        elif path == '/styles.css':
-            # Serve CSS file
-            self.send_response(200)
-            self.send_header('Content-type', 'text/css')
-            self.end_headers()
-            with open('styles.css', 'rb') as f:
-                self.wfile.write(f.read())
+        elif path == '/readyz':
+            # Ready once the startup warm-up has loaded the latest gameweek
+            if _ready.is_set():
+                self.send_body(b'{"status": "ready"}', 'application/json')
+            else:
+                self.send_body(b'{"status": "warming up"}', 'application/json', status=503)
         
-        elif path == '/script.js':
-            # Serve JavaScript file
-            self.send_response(200)
-            self.send_header('Content-type', 'application/javascript')
-            self.end_headers()
-            with open('script.js', 'rb') as f:
-                self.wfile.write(f.read())
+        elif path == '/metrics':
+            # Prometheus scrape endpoint
+            self.send_body(render_metrics(), 'text/plain; version=0.0.4; charset=utf-8')
+        
+        elif path == '/api/leagues':
+            # Return the leagues this instance tracks
+            self.send_json(path, lambda: json.dumps(LEAGUE_IDS).encode())
         
-        elif path == '/api/gameweeks':
+        elif path.startswith('/api/'):
+            self.handle_api(path)
+        
+        else:
+            self.send_error(404, "Not found")
+
+    def handle_api(self, path):
+        """Route a league-scoped API request.
+
+        ``/api/league/<id>/...`` serves a configured league; the unscoped
+        ``/api/...`` routes serve the default league.
+        """
+        league_id = LEAGUE_ID
+        api_path = path
+        if path.startswith('/api/league/'):
+            league_part, _, rest = path[len('/api/league/'):].partition('/')
+            try:
+                league_id = int(league_part)
+            except ValueError:
+                self.send_error(400, "Invalid league id")
+                return
+            if league_id not in LEAGUE_IDS:
+                self.send_error(404, "Unknown league")
+                return
+            api_path = '/api/' + rest
+        
+        if api_path == '/api/stream':
+            # Push standings changes as they are stored
+            self.start_stream(league_id)
+
+        elif api_path == '/api/gameweeks':
             # Return list of available gameweeks with data
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            gameweeks = get_available_gameweeks()
-            print(f"Sending gameweeks: {gameweeks}")
-            self.wfile.write(json.dumps(gameweeks).encode())
+            def build():
+                gameweeks = get_available_gameweeks(league_id)
+                logger.debug(f"Sending gameweeks: {gameweeks}")
+                return json.dumps(gameweeks).encode()
+            self.send_json(path, build)
         
-        elif path == '/api/current-gameweek':
+        elif api_path == '/api/current-gameweek':
             # Return the latest gameweek with data
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            gameweeks = get_available_gameweeks()
-            current_gw = gameweeks[-1] if gameweeks else 1
-            self.wfile.write(json.dumps({'current_gameweek': current_gw}).encode())
+            def build():
+                gameweeks = get_available_gameweeks(league_id)
+                current_gw = gameweeks[-1] if gameweeks else 1
+                return json.dumps({'current_gameweek': current_gw}).encode()
+            self.send_json(path, build)
+        
+        elif api_path == '/api/award-summary':
+            # Return award counts and streaks per manager for the season
+            self.send_json(path, lambda: _cached_response(
+                (league_id, 'award-summary'),
+                lambda: json.dumps(get_season_award_summary(league_id)).encode()))
         
-        elif path == '/api/all-data':
+        elif api_path.startswith('/api/awards-history/'):
+            # Return every winner of one award type with per-team win counts
+            award_type = api_path[len('/api/awards-history/'):]
+            if award_type not in AWARD_TYPES:
+                self.send_error(404, "Unknown award type")
+                return
+            self.send_json(path, lambda: _cached_response(
+                (league_id, 'awards-history', award_type),
+                lambda: json.dumps(get_awards_history(award_type, league_id)).encode()))
+
+        elif api_path.startswith('/api/team/'):
+            # One manager's season, read from the team_history index
+            match = re.fullmatch(r'/api/team/(\d+)/history', api_path)
+            if not match:
+                self.send_error(404, "Not found")
+                return
+            team_id = int(match.group(1))
+
+            def build():
+                history = get_team_history(team_id, league_id)
+                return json.dumps(history).encode() if history else None
+            if not self.send_json(path, build):
+                self.send_error(404, "Unknown team")
+
+        elif api_path == '/api/all-data':
             # Return data for all gameweeks
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            all_data = get_all_gameweek_data()
-            self.wfile.write(json.dumps(all_data).encode())
+            self.send_json(path, lambda: iter_all_gameweek_json(league_id),
+                           upstream=(league_id, 'all') not in _response_cache)
         
-        elif path.startswith('/api/data/'):
+        elif api_path.startswith('/api/data/'):
             # Handle data requests
             try:
-                gameweek = int(parsed_path.path.split('/')[-1])
-                print(f"Fetching data for gameweek {gameweek}")
+                gameweek = int(api_path.split('/')[-1])
+                logger.debug(f"Fetching data for gameweek {gameweek}")
                 if 1 <= gameweek <= 38:
-                    data = get_fpl_data(gameweek)
-                    if data:
-                        self.send_response(200)
-                        self.send_header('Content-type', 'application/json')
-                        self.end_headers()
-                        self.wfile.write(json.dumps(data).encode())
-                        print(f"Successfully sent data for gameweek {gameweek}")
+                    if self.send_json(path, lambda: get_gameweek_json(gameweek, league_id),
+                                      lambda: get_gameweek_changed_at(gameweek, league_id),
+                                      upstream=(league_id, gameweek) not in _response_cache):
+                        logger.debug(f"Successfully sent data for gameweek {gameweek}")
                     else:
-                        print(f"No data found for gameweek {gameweek}")
+                        logger.warning(f"No data found for gameweek {gameweek}")
                         self.send_error(500, "Failed to fetch FPL data")
                 else:
-                    print(f"Invalid gameweek number: {gameweek}")
+                    logger.warning(f"Invalid gameweek number: {gameweek}")
                     self.send_error(400, "Invalid gameweek number")
             except ValueError as e:
-                print(f"Error parsing gameweek: {e}")
+                logger.warning(f"Error parsing gameweek: {e}")
                 self.send_error(400, "Invalid gameweek format")
             except Exception as e:
-                print(f"Error handling data request: {e}")
+                logger.error(f"Error handling data request: {e}")
                 self.send_error(500, "Internal server error")
         
         else:
             self.send_error(404, "Not found")
 
+def request_head_complete(data):
+    """Whether ``data`` holds a whole request line and headers (or too much to wait for)."""
+    return b'\r\n\r\n' in data or b'\n\n' in data or len(data) >= MAX_REQUEST_HEAD
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles each connection on a bounded pool of worker threads.
+
+    A request stuck on the FPL API only holds its own worker, and at most
+    UPSTREAM_WORKERS of them do, so static and cached responses keep flowing on
+    the others. New and idle keep-alive connections don't hold a worker: they
+    are parked on a selector that reads each request head as it arrives, hands
+    the connection to the pool once the head is complete, and closes it after
+    FPLHandler.timeout without one.
+    """
+
+    def __init__(self, server_address, handler_class, workers=HTTP_WORKERS,
+                 upstream_workers=UPSTREAM_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fpl-http')
+        # Requests that may wait on the FPL API hold a slot; one worker is always left over
+        self.upstream_slots = threading.BoundedSemaphore(max(1, min(upstream_workers, workers - 1)))
+        self.idle_timeout = handler_class.timeout
+        self._parking = queue.Queue()
+        # Socket -> request bytes the watcher read before handing it to a worker
+        self._buffered = {}
+        self._waker, self._wake = socket.socketpair()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._waker, selectors.EVENT_READ)
+        self._closing = False
+        threading.Thread(target=self.watch_parked, daemon=True, name='fpl-http-idle').start()
+
+    def process_request(self, request, client_address):
+        # Headers and body go out as separate writes; without this a keep-alive
+        # client's delayed ACK holds the body back for ~40 ms
+        try:
+            request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        # Wait for the request head off the worker pool
+        self.park(request, client_address)
+
+    def finish_request(self, request, client_address):
+        """Handle a connection and return its handler."""
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def process_request_worker(self, request, client_address):
+        handler = None
+        try:
+            handler = self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            if handler is not None and handler.parked:
+                self.park(request, client_address, handler.unread)
+            elif handler is None or not handler.detached:
+                self.shutdown_request(request)
+
+    def park(self, request, client_address, buffered=b''):
+        """Watch a connection for its next request head without holding a worker."""
+        self._parking.put((request, client_address, buffered))
+        self.park_wakeup()
+
+    def dispatch(self, request, client_address, buffered):
+        """Hand a connection with a complete request head to a worker."""
+        self._buffered[request] = buffered
+        try:
+            self.workers.submit(self.process_request_worker, request, client_address)
+        except RuntimeError:  # The pool is shutting down
+            self._buffered.pop(request, None)
+            self.shutdown_request(request)
+
+    def take_buffered(self, request):
+        """Return and forget the bytes read ahead from ``request`` while it was parked."""
+        return self._buffered.pop(request, b'')
+
+    def park_wakeup(self):
+        """Interrupt the idle watcher's select so it picks up new work."""
+        try:
+            self._wake.send(b'\0')
+        except OSError:
+            pass
+
+    def watch_parked(self):
+        """Read parked connections' request heads and dispatch them once complete.
+
+        Connections that stay idle or half-sent for longer than the idle
+        timeout are closed.
+        """
+        while not self._closing:
+            for key, _ in self._selector.select(timeout=1):
+                if key.fileobj is self._waker:
+                    self._waker.recv(4096)
+                    continue
+                request = key.fileobj
+                client_address, since, buffered = key.data
+                try:
+                    data = request.recv(MAX_REQUEST_HEAD)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    data = b''
+                if not data:  # The client closed the connection
+                    self._selector.unregister(request)
+                    self.shutdown_request(request)
+                elif request_head_complete(buffered + data):
+                    self._selector.unregister(request)
+                    self.dispatch(request, client_address, buffered + data)
+                else:
+                    self._selector.modify(request, selectors.EVENT_READ,
+                                          (client_address, since, buffered + data))
+            while True:
+                try:
+                    request, client_address, buffered = self._parking.get_nowait()
+                except queue.Empty:
+                    break
+                if request_head_complete(buffered):  # Pipelined behind the last request
+                    self.dispatch(request, client_address, buffered)
+                else:
+                    self._selector.register(request, selectors.EVENT_READ,
+                                            (client_address, time.monotonic(), buffered))
+            deadline = time.monotonic() - self.idle_timeout
+            for key in list(self._selector.get_map().values()):
+                if key.data and key.data[1] < deadline:
+                    self._selector.unregister(key.fileobj)
+                    self.shutdown_request(key.fileobj)
+
+        for key in list(self._selector.get_map().values()):
+            if key.data:
+                self.shutdown_request(key.fileobj)
+        self._selector.close()
+        self._waker.close()
+        self._wake.close()
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        self.park_wakeup()
+        self.workers.shutdown(wait=False)
+
+def configure_logging():
+    """Send the app's log records to stderr at FPL_LOG_LEVEL."""
+    if LOG_LEVEL == 'OFF':
+        logger.disabled = True
+        return
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if isinstance(logging.getLevelName(LOG_LEVEL), int):
+        logger.setLevel(LOG_LEVEL)
+    else:
+        logger.setLevel(logging.INFO)
+        logger.warning(f"Unknown FPL_LOG_LEVEL {LOG_LEVEL!r}, logging at INFO")
+
+def warm_up_and_refresh():
+    """Preload the latest gameweek, mark the server ready, then keep the data fresh."""
+    try:
+        preload_data()
+    except Exception as e:
+        logger.exception(f"Error during warm-up: {e}")
+    finally:
+        _ready.set()
+    refresh_data_periodically()
+
+def start_background_refresh():
+    """Start the one warm-up and refresh thread for this process, if it isn't running."""
+    global _refresh_thread
+    with _refresh_lock:
+        if _refresh_thread is None:
+            _refresh_thread = threading.Thread(target=warm_up_and_refresh, daemon=True,
+                                               name='fpl-refresh')
+            _refresh_thread.start()
+    return _refresh_thread
+
 def run_server():
+    """Bind the port straight away and warm up the data in the background.
+
+    Static files and whatever is already in the database are served while the
+    refresh thread preloads the latest gameweek; /readyz reports when it's done.
+    """
+    configure_logging()
     try:
         # Initialize database
-        print("Initializing database...")
+        logger.info("Initializing database...")
         init_db()
         
         # Create cache directory if it doesn't exist
         os.makedirs('cache', exist_ok=True)
-        print("Cache directory created/verified")
-        
-        # Preload initial data
-        print("Preloading initial data...")
-        latest_gw = get_latest_valid_gameweek()
-        print(f"Latest valid gameweek: {latest_gw}")
+        logger.debug("Cache directory created/verified")
         
-        # Force fetch the latest gameweek data
-        data = get_fpl_data(latest_gw)
-        if data:
-            print(f"Successfully loaded gameweek {latest_gw}")
-            store_fpl_data(latest_gw, data['standings'])
-            store_award_winners(latest_gw, data['standings'], data['awards'].get('gameweek_champion', []))
-        else:
-            print(f"Failed to load gameweek {latest_gw}")
-        
-        # Start the periodic refresh thread
-        print("Starting periodic refresh thread...")
-        refresh_thread = threading.Thread(target=refresh_data_periodically, daemon=True)
-        refresh_thread.start()
+        # Read static files into memory so requests never touch the disk
+        load_static_assets()
         
         # Start the server
         server_address = ('', int(os.environ.get('PORT', 8000)))
-        print(f"Starting server on port {server_address[1]}")
-        httpd = HTTPServer(server_address, FPLHandler)
-        print("Server started successfully")
+        logger.info(f"Starting server on port {server_address[1]}")
+        httpd = PooledHTTPServer(server_address, FPLHandler)
+        
+        # Preload the latest gameweek for every league, then refresh on schedule
+        logger.info("Starting warm-up and periodic refresh thread...")
+        start_background_refresh()
+        
+        logger.info(f"Server started successfully with {HTTP_WORKERS} workers")
         httpd.serve_forever()
     except Exception as e:
-        print(f"Error starting server: {e}")
+        logger.error(f"Error starting server: {e}")
         raise
 
 def main():
-    """Main function to initialize and run the server with periodic updates."""
+    """Main function to run the server; it starts the periodic refresh itself."""
     try:
-        # Initialize the database
-        init_db()
-        
-        # Start the periodic refresh in a separate thread
-        refresh_thread = threading.Thread(target=refresh_data_periodically, daemon=True)
-        refresh_thread.start()
-        
-        # Run the server
         run_server()
     except Exception as e:
-        print(f"Fatal error: {e}")
+        logger.error(f"Fatal error: {e}")
         sys.exit(1)
 
 def get_current_gameweek_data():
     """Fetch current gameweek data from the bootstrap-static endpoint."""
     try:
-        response = requests.get('https://fantasy.premierleague.com/api/bootstrap-static/', verify=False)
-        if response.status_code == 200:
-            data = response.json()
-            events = data['events']
+        events = get_events()
+        if events is not None:
             current_event = next((event for event in events if event['is_current']), None)
             
             if current_event:
@@ -714,10 +3102,10 @@ def get_current_gameweek_data():
                 print("No current gameweek found")
                 return None
         else:
-            print(f"Error fetching current gameweek data: {response.status_code}")
+            logger.error("Error fetching current gameweek data")
             return None
     except Exception as e:
-        print(f"Error in get_current_gameweek_data: {e}")
+        logger.error(f"Error in get_current_gameweek_data: {e}")
         return None
 
 if __name__ == "__main__":
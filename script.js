@@ -152,20 +152,21 @@ document.addEventListener('DOMContentLoaded', function() {
     if (gameweeks.length > 0) {
       select.value = currentGWObj.current_gameweek;
     }
-    // Load all gameweek data for history, etc.
-    fetch('/api/all-data')
-      .then(response => response.json())
-      .then(allData => {
-        allGameweekData = allData;
-        displayGameweekData(select.value);
-      });
+    // Only the selected gameweek is downloaded; others load when picked
+    loadGameweekData(select.value).then(() => {
+      displayGameweekData(select.value);
+      showActiveAwardsHistory();
+      connectStream();
+    });
   });
 
   // Handle gameweek selection
   document.getElementById('gameweekSelect').addEventListener('change', function(e) {
     const gameweek = e.target.value;
     if (gameweek) {
-      displayGameweekData(gameweek);
+      loadGameweekData(gameweek).then(() => {
+        if (e.target.value === gameweek) displayGameweekData(gameweek);
+      });
     }
   });
 
@@ -186,31 +187,53 @@ document.addEventListener('DOMContentLoaded', function() {
   });
 });
 
+// Gameweeks fetched so far, keyed by gameweek number
 let allGameweekData = {};
+// Data version of allGameweekData, from the API's ETag and stream events
+let dataVersion = null;
 
-function loadAllGameweekData() {
-    // Load all gameweek data
-    return fetch('/api/all-data')
-        .then(response => response.json())
-        .then(allData => {
-            allGameweekData = allData;
-            
-            // Get the selected gameweek from the dropdown
-            const selectedGameweek = document.getElementById('gameweekSelect').value;
-            console.log('Displaying data for gameweek:', selectedGameweek);
-            
-            // Display the selected gameweek data
-            displayGameweekData(selectedGameweek);
-            
-            // Initialize awards history with the first tab
-            const firstTab = document.querySelector('.tab-button.active');
-            if (firstTab) {
-                displayAwardsHistory(firstTab.dataset.award);
-            }
+function versionFromResponse(response) {
+    const etag = response.headers.get('ETag') || '';
+    return etag.replace(/^W\//, '').replace(/"/g, '');
+}
+
+function fetchRetryingBusy(url, retries = 3) {
+    // The server answers 503 with Retry-After while its FPL API workers are all taken
+    return fetch(url).then(response => {
+        if (response.status !== 503 || retries <= 0) return response;
+        const delay = (Number(response.headers.get('Retry-After')) || 1) * 1000;
+        return new Promise(resolve => setTimeout(resolve, delay))
+            .then(() => fetchRetryingBusy(url, retries - 1));
+    });
+}
+
+function loadGameweekData(gameweek) {
+    // Fetch one gameweek's standings and awards unless we already have them
+    if (!gameweek || allGameweekData[gameweek]) {
+        return Promise.resolve();
+    }
+    return fetchRetryingBusy(`/api/data/${gameweek}`)
+        .then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            dataVersion = versionFromResponse(response);
+            return response.json();
+        })
+        .then(data => {
+            allGameweekData[gameweek] = data;
         })
         .catch(error => console.error('Error loading gameweek data:', error));
 }
 
+function reloadGameweekData() {
+    // Drop everything we have and fetch the selected gameweek again
+    allGameweekData = {};
+    const selectedGameweek = document.getElementById('gameweekSelect').value;
+    return loadGameweekData(selectedGameweek).then(() => {
+        displayGameweekData(selectedGameweek);
+        showActiveAwardsHistory();
+    });
+}
+
 function displayGameweekData(gameweek) {
     const data = allGameweekData[gameweek];
     if (data) {
@@ -228,31 +251,108 @@ function updateTable(data) {
 
     sortedData.forEach((team, index) => {
         const row = document.createElement('tr');
-        
-        // Add rank change indicator
-        let rankChangeHtml = '';
-        if (team.rank_change) {
-            const change = team.rank_change;
-            const arrow = change > 0 ? '↑' : change < 0 ? '↓' : '→';
-            const color = change > 0 ? 'green' : change < 0 ? 'red' : 'gray';
-            rankChangeHtml = `<span style="color: ${color}">${arrow} ${Math.abs(change)}</span>`;
-        }
+        renderStandingsRow(row, team, index + 1);
+        tbody.appendChild(row);
+    });
+}
+
+function renderStandingsRow(row, team, position) {
+    // Add rank change indicator
+    let rankChangeHtml = '';
+    if (team.rank_change) {
+        const change = team.rank_change;
+        const arrow = change > 0 ? '↑' : change < 0 ? '↓' : '→';
+        const color = change > 0 ? 'green' : change < 0 ? 'red' : 'gray';
+        rankChangeHtml = `<span style="color: ${color}">${arrow} ${Math.abs(change)}</span>`;
+    }
+
+    row.dataset.teamId = team.team_id;
+    row.dataset.position = position;
+    row.innerHTML = `
+        <td>${position}</td>
+        <td>${team.team_name}</td>
+        <td>${team.manager_name}</td>
+        <td>${team.gw_points}</td>
+        <td>${team.total_points}</td>
+        <td>£${team.team_value.toFixed(1)}m</td>
+        <td>£${team.bank_balance.toFixed(1)}m</td>
+        <td>${rankChangeHtml}</td>
+    `;
+}
+
+function patchTable(data, changedTeams, removedTeams) {
+    // Re-render only rows whose team or position changed and move the rest
+    const tbody = document.querySelector('#standingsTable tbody');
+    const rows = new Map([...tbody.rows].map(row => [row.dataset.teamId, row]));
+    removedTeams.forEach(teamId => {
+        const row = rows.get(String(teamId));
+        if (row) row.remove();
+    });
 
-        row.innerHTML = `
-            <td>${index + 1}</td>
-            <td>${team.team_name}</td>
-            <td>${team.manager_name}</td>
-            <td>${team.gw_points}</td>
-            <td>${team.total_points}</td>
-            <td>£${team.team_value.toFixed(1)}m</td>
-            <td>£${team.bank_balance.toFixed(1)}m</td>
-            <td>${rankChangeHtml}</td>
-        `;
-        
+    const changed = new Set(changedTeams.map(team => String(team.team_id)));
+    const sortedData = [...data].sort((a, b) => b.total_points - a.total_points);
+    sortedData.forEach((team, index) => {
+        const teamId = String(team.team_id);
+        let row = rows.get(teamId);
+        if (!row) {
+            row = document.createElement('tr');
+        }
+        if (!row.dataset.teamId || changed.has(teamId) || row.dataset.position !== String(index + 1)) {
+            renderStandingsRow(row, team, index + 1);
+        }
         tbody.appendChild(row);
     });
 }
 
+function connectStream() {
+    // Live standings changes are pushed over Server-Sent Events
+    if (!window.EventSource) return;
+    const source = new EventSource('/api/stream');
+
+    source.addEventListener('hello', event => {
+        // Updates sent while disconnected are lost, so resync if anything changed
+        const hello = JSON.parse(event.data);
+        if (hello.version !== dataVersion) {
+            reloadGameweekData();
+        }
+    });
+
+    source.addEventListener('standings', event => {
+        applyStandingsUpdate(JSON.parse(event.data));
+    });
+}
+
+function applyStandingsUpdate(update) {
+    const gameweek = String(update.gameweek);
+    const existing = allGameweekData[gameweek];
+    const awardsChanged = !existing || JSON.stringify(existing.awards) !== JSON.stringify(update.awards);
+    dataVersion = update.version;
+    if (existing) {
+        // Gameweeks we haven't loaded are fetched in full when picked
+        const byTeam = new Map(existing.standings.map(team => [team.team_id, team]));
+        update.removed.forEach(teamId => byTeam.delete(teamId));
+        update.standings.forEach(team => byTeam.set(team.team_id, team));
+        allGameweekData[gameweek] = { standings: [...byTeam.values()], awards: update.awards };
+    }
+
+    const select = document.getElementById('gameweekSelect');
+    if (![...select.options].some(option => option.value === gameweek)) {
+        const option = document.createElement('option');
+        option.value = gameweek;
+        option.textContent = `Gameweek ${gameweek}`;
+        select.appendChild(option);
+    }
+
+    if (existing && select.value === gameweek) {
+        patchTable(allGameweekData[gameweek].standings, update.standings, update.removed);
+        updateAwards(update.awards);
+    }
+
+    if (awardsChanged) {
+        showActiveAwardsHistory();
+    }
+}
+
 function updateAwards(awards) {
     if (!awards) return;
 
@@ -293,55 +393,45 @@ function updateAwards(awards) {
     }
 }
 
+function showActiveAwardsHistory() {
+    const activeTab = document.querySelector('.tab-button.active');
+    if (activeTab) {
+        displayAwardsHistory(activeTab.dataset.award);
+    }
+}
+
 function displayAwardsHistory(awardType) {
     const historyContent = document.getElementById('awardsHistoryContent');
-    if (!allGameweekData) {
-        historyContent.innerHTML = '<p>No awards data available.</p>';
-        return;
-    }
 
-    // Collect all awards of the specified type across all gameweeks
-    const allAwards = [];
-    Object.entries(allGameweekData).forEach(([gameweek, data]) => {
-        if (data.awards && data.awards[awardType]) {
-            data.awards[awardType].forEach(winner => {
-                allAwards.push({
-                    gameweek: parseInt(gameweek),
-                    ...winner
-                });
-            });
-        }
-    });
+    // Winners and win counts come from the server, newest gameweek first
+    fetch(`/api/awards-history/${awardType}`)
+        .then(response => response.json())
+        .then(allAwards => {
+            // Ignore answers for a tab the user has already left
+            const activeTab = document.querySelector('.tab-button.active');
+            if (activeTab && activeTab.dataset.award !== awardType) return;
+
+            if (allAwards.length === 0) {
+                historyContent.innerHTML = '<p>No awards data available.</p>';
+                return;
+            }
 
-    if (allAwards.length === 0) {
-        historyContent.innerHTML = '<p>No awards data available.</p>';
-        return;
-    }
+            const historyHTML = allAwards.map(award => {
+                const winBadge = award.wins > 1 ? `<span class="win-badge">${award.wins}×</span>` : '';
 
-    // Count wins for each manager
-    const winCounts = {};
-    allAwards.forEach(award => {
-        const key = `${award.manager_name} (${award.team_name})`;
-        winCounts[key] = (winCounts[key] || 0) + 1;
-    });
+                return `
+                    <div class="award-history-item">
+                        <h3>Gameweek ${award.gameweek}</h3>
+                        <p class="team-name">${award.team_name}</p>
+                        <p class="manager-name">${award.manager_name} ${winBadge}</p>
+                        <p class="points">${award.points} points</p>
+                    </div>
+                `;
+            }).join('');
 
-    // Sort by gameweek (descending)
-    allAwards.sort((a, b) => b.gameweek - a.gameweek);
-
-    const historyHTML = allAwards.map(award => {
-        const key = `${award.manager_name} (${award.team_name})`;
-        const winCount = winCounts[key];
-        const winBadge = winCount > 1 ? `<span class="win-badge">${winCount}×</span>` : '';
-        
-        return `
-            <div class="award-history-item">
-                <h3>Gameweek ${award.gameweek}</h3>
-                <p class="team-name">${award.team_name}</p>
-                <p class="manager-name">${award.manager_name} ${winBadge}</p>
-                <p class="points">${award.points} points</p>
-            </div>
-        `;
-    }).join('');
-
-    historyContent.innerHTML = historyHTML;
+            historyContent.innerHTML = historyHTML;
+        })
+        .catch(() => {
+            historyContent.innerHTML = '<p>No awards data available.</p>';
+        });
 }